@@ -7,53 +7,128 @@ A comprehensive web scraping tool for stock market data analysis
 import os
 import sys
 import argparse
+import atexit
 import logging
-from datetime import datetime
-from typing import List, Optional
-
-# Import our custom modules
-from stock_scraper.scraper import StockScraper
-from stock_scraper.data_processor import DataProcessor
-from stock_scraper.analyzer import StockAnalyzer
-from stock_scraper.scheduler import SchedulerManager
+import logging.handlers
+import time
+from functools import cached_property
+from typing import TYPE_CHECKING, List, Optional
+
+# Import our custom modules (components and storage are imported lazily, see below)
 from stock_scraper.config import Config
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 # Configure logging
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+CONSOLE_LOG_FORMAT = '%(asctime)s %(levelname)s %(name)s: %(message)s'
+
+# Records never use thread/process fields, so skip collecting them, and
+# never let a failing handler print tracebacks in the middle of a run
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
+logging.raiseExceptions = False
+
+# An explicit datefmt avoids the extra millisecond formatting of the default
+file_formatter = logging.Formatter(LOG_FORMAT, datefmt='%Y-%m-%d %H:%M:%S')
+console_formatter = logging.Formatter(CONSOLE_LOG_FORMAT, datefmt='%H:%M:%S')
+
+# Buffer file records in memory and write them in batches; errors flush immediately
+file_handler = logging.FileHandler('stock_scraper.log')
+file_handler.setFormatter(file_formatter)
+buffered_file_handler = logging.handlers.MemoryHandler(
+    capacity=1024,
+    flushLevel=logging.ERROR,
+    target=file_handler
+)
+atexit.register(buffered_file_handler.flush)
+
+console_handler = logging.StreamHandler()
+console_handler.setFormatter(console_formatter)
+
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     handlers=[
-        logging.FileHandler('stock_scraper.log'),
-        logging.StreamHandler()
+        buffered_file_handler,
+        console_handler
     ]
 )
 logger = logging.getLogger(__name__)
 
+# Menu text is built once and written with a single call per render
+BANNER = "\n" + "=" * 50 + "\n    STOCK DATA WEB SCRAPER\n" + "=" * 50 + "\n"
+
+MAIN_MENU = (
+    "\n--- Main Menu ---\n"
+    "1. Collect Stock Data\n"
+    "2. Process and Clean Data\n"
+    "3. Analyze Data\n"
+    "4. Generate Visualizations\n"
+    "5. Schedule Data Collection\n"
+    "6. View Collected Data\n"
+    "7. Exit\n"
+)
+
+# File-name timestamps only change once a second, so format each second once
+_timestamp_cache = {'second': None, 'value': ''}
+
+def _file_timestamp() -> str:
+    """Return the YYYYmmdd_HHMMSS suffix used in output file names"""
+    now = int(time.time())
+    if now != _timestamp_cache['second']:
+        _timestamp_cache['second'] = now
+        _timestamp_cache['value'] = time.strftime("%Y%m%d_%H%M%S", time.localtime(now))
+    return _timestamp_cache['value']
+
 class StockScraperApp:
     """Main application class for Stock Data Web Scraper"""
     
-    def __init__(self):
+    def __init__(self, use_cache: bool = True, output_format: Optional[str] = None):
         self.config = Config()
-        self.scraper = StockScraper()
-        self.processor = DataProcessor()
-        self.analyzer = StockAnalyzer()
-        self.scheduler = SchedulerManager()
+        self.config.directories  # Creates the data, log and output directories
+        self.use_cache = use_cache
+        self.raw_format = output_format or self.config.RAW_DATA_FORMAT
+        self.processed_format = output_format or self.config.PROCESSED_DATA_FORMAT
+    
+    # Lazy components: a run only imports the stacks it actually uses
+    @cached_property
+    def scraper(self):
+        """Stock scraper, created on first use"""
+        from stock_scraper.scraper import StockScraper
+        return StockScraper(use_cache=self.use_cache)
+    
+    @cached_property
+    def processor(self):
+        """Data processor, created on first use"""
+        from stock_scraper.data_processor import DataProcessor
+        return DataProcessor()
+    
+    @cached_property
+    def analyzer(self):
+        """Stock analyzer, created on first use"""
+        from stock_scraper.analyzer import StockAnalyzer
+        return StockAnalyzer()
+    
+    @cached_property
+    def scheduler(self):
+        """Scheduler manager, created on first use"""
+        from stock_scraper.scheduler import SchedulerManager
+        return SchedulerManager()
+    
+    def close(self):
+        """Release the scraper's connections and browser, if it was created"""
+        scraper = self.__dict__.get('scraper')
+        if scraper is not None:
+            scraper.close()
         
     def interactive_mode(self):
         """Interactive menu-driven interface"""
-        print("\n" + "="*50)
-        print("    STOCK DATA WEB SCRAPER")
-        print("="*50)
+        sys.stdout.write(BANNER)
         
         while True:
-            print("\n--- Main Menu ---")
-            print("1. Collect Stock Data")
-            print("2. Process and Clean Data")
-            print("3. Analyze Data")
-            print("4. Generate Visualizations")
-            print("5. Schedule Data Collection")
-            print("6. View Collected Data")
-            print("7. Exit")
+            sys.stdout.write(MAIN_MENU)
             
             choice = input("\nEnter your choice (1-7): ").strip()
             
@@ -80,6 +155,10 @@ class StockScraperApp:
                 logger.error(f"Error in interactive mode: {e}")
                 print(f"\nError: {e}")
                 
+    def scrape_symbols(self, symbols: List[str]) -> Optional['pd.DataFrame']:
+        """Scrape symbols concurrently, preferring asyncio over the thread pool"""
+        return self.scraper.scrape_concurrently(symbols)
+    
     def collect_data_interactive(self):
         """Interactive data collection"""
         print("\n--- Data Collection ---")
@@ -90,18 +169,20 @@ class StockScraperApp:
             print("No symbols provided. Using default symbols.")
             symbols = self.config.DEFAULT_SYMBOLS
         else:
-            symbols = [s.strip().upper() for s in symbols_input.split(',')]
+            # The scraper upper-cases and dedupes them, so "AAPL, aapl" is fetched once
+            symbols = symbols_input.split(',')
             
-        print(f"\nCollecting data for: {', '.join(symbols)}")
+        print(f"\nCollecting data for: {', '.join(s.strip() for s in symbols)}")
         
         # Collect data
         try:
-            raw_data = self.scraper.scrape_multiple_stocks(symbols)
+            raw_data = self.scrape_symbols(symbols)
             
             if raw_data is not None:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"raw_stock_data_{timestamp}.csv"
-                raw_data.to_csv(filename, index=False)
+                from stock_scraper.storage import save_dataframe
+                
+                timestamp = _file_timestamp()
+                filename = save_dataframe(raw_data, f"raw_stock_data_{timestamp}", self.raw_format)
                 print(f"\nData collection completed! Saved to: {filename}")
                 print(f"Collected data for {len(raw_data)} stocks.")
             else:
@@ -131,9 +212,10 @@ class StockScraperApp:
             processed_data = self.processor.process_data(filename)
             
             if processed_data is not None:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                output_filename = f"processed_stock_data_{timestamp}.csv"
-                processed_data.to_csv(output_filename, index=False)
+                from stock_scraper.storage import save_dataframe
+                
+                timestamp = _file_timestamp()
+                output_filename = save_dataframe(processed_data, f"processed_stock_data_{timestamp}", self.processed_format)
                 print(f"\nData processing completed! Saved to: {output_filename}")
                 print(f"Processed {len(processed_data)} records.")
             else:
@@ -157,22 +239,32 @@ class StockScraperApp:
     def view_data_interactive(self):
         """Interactive data viewing"""
         print("\n--- View Collected Data ---")
+        from stock_scraper.storage import DATA_FILE_EXTENSIONS, list_dataset_files
         
-        # List available files
-        csv_files = [f for f in os.listdir('.') if f.endswith('.csv')]
+        # List available files, newest first since that is usually the one wanted
+        files = [
+            (entry.stat().st_mtime, entry.name) for entry in os.scandir('.')
+            if entry.name.endswith(DATA_FILE_EXTENSIONS) and entry.is_file()
+        ]
+        files.extend(
+            (os.path.getmtime(path), path)
+            for path in list_dataset_files(self.config.RAW_DATASET_DIRECTORY)
+        )
+        files.sort(reverse=True)
+        data_files = [name for _, name in files]
         
-        if not csv_files:
-            print("No CSV files found in current directory.")
+        if not data_files:
+            print("No data files found in current directory.")
             return
         
         print("Available data files:")
-        for i, file in enumerate(csv_files, 1):
+        for i, file in enumerate(data_files, 1):
             print(f"{i}. {file}")
         
         try:
-            choice = int(input(f"\nSelect file to view (1-{len(csv_files)}): ")) - 1
-            if 0 <= choice < len(csv_files):
-                selected_file = csv_files[choice]
+            choice = int(input(f"\nSelect file to view (1-{len(data_files)}): ")) - 1
+            if 0 <= choice < len(data_files):
+                selected_file = data_files[choice]
                 self.processor.preview_data(selected_file)
             else:
                 print("Invalid selection.")
@@ -182,17 +274,18 @@ class StockScraperApp:
     def run_cli(self, args):
         """Run command-line interface"""
         if args.collect:
-            symbols = args.symbols if args.symbols else self.config.DEFAULT_SYMBOLS
-            raw_data = self.scraper.scrape_multiple_stocks(symbols)
+            symbols = args.symbols or self.config.DEFAULT_SYMBOLS
+            raw_data = self.scrape_symbols(symbols)
             
             if raw_data is not None:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"raw_stock_data_{timestamp}.csv"
-                raw_data.to_csv(filename, index=False)
+                from stock_scraper.storage import save_dataframe
+                
+                timestamp = _file_timestamp()
+                filename = save_dataframe(raw_data, f"raw_stock_data_{timestamp}", self.raw_format)
                 print(f"Data collected and saved to: {filename}")
 
-def main():
-    """Main function"""
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command-line argument parser"""
     parser = argparse.ArgumentParser(description='Stock Data Web Scraper')
     parser.add_argument('--collect', action='store_true', help='Collect stock data')
     parser.add_argument('--process', action='store_true', help='Process raw data')
@@ -202,16 +295,28 @@ def main():
     parser.add_argument('--symbols', nargs='+', help='Stock symbols to collect')
     parser.add_argument('--file', help='Input file for processing/analysis')
     parser.add_argument('--config', choices=['daily', 'market_hours', 'hourly'], help='Scheduler configuration')
+    parser.add_argument('--no-cache', action='store_true', help='Disable the HTTP response and scraped record caches')
+    parser.add_argument('--format', choices=['parquet', 'arrow', 'csv'], help='Output file format (overrides the configured defaults)')
+    return parser
+
+def main():
+    """Main function"""
+    # If no arguments provided, run interactive mode without building the parser
+    if len(sys.argv) == 1:
+        app = StockScraperApp()
+        try:
+            app.interactive_mode()
+        finally:
+            app.close()
+        return
     
-    args = parser.parse_args()
-    
-    app = StockScraperApp()
+    args = build_parser().parse_args()
     
-    # If no arguments provided, run interactive mode
-    if len(sys.argv) == 1:
-        app.interactive_mode()
-    else:
+    app = StockScraperApp(use_cache=not args.no_cache, output_format=args.format)
+    try:
         app.run_cli(args)
+    finally:
+        app.close()
 
 if __name__ == "__main__":
     main()
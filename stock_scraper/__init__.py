@@ -3,15 +3,21 @@ Stock Data Web Scraper Package
 A comprehensive web scraping tool for stock market data analysis
 """
 
+import importlib
+
 __version__ = "1.0.0"
 __author__ = "Stock Scraper Team"
 __email__ = "contact@stockscraper.com"
 
-from .scraper import StockScraper
-from .data_processor import DataProcessor
-from .analyzer import StockAnalyzer
-from .scheduler import SchedulerManager
-from .config import Config
+# Public classes are loaded on first attribute access (PEP 562) so that
+# importing a single submodule does not pull in every heavy dependency
+_LAZY_EXPORTS = {
+    'StockScraper': '.scraper',
+    'DataProcessor': '.data_processor',
+    'StockAnalyzer': '.analyzer',
+    'SchedulerManager': '.scheduler',
+    'Config': '.config'
+}
 
 __all__ = [
     'StockScraper',
@@ -20,3 +26,18 @@ __all__ = [
     'SchedulerManager',
     'Config'
 ]
+
+
+def __getattr__(name):
+    """Import public classes on first access"""
+    if name in _LAZY_EXPORTS:
+        module = importlib.import_module(_LAZY_EXPORTS[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    """Include lazily loaded classes in dir()"""
+    return sorted(list(globals()) + list(_LAZY_EXPORTS))
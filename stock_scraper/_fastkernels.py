@@ -0,0 +1,109 @@
+"""
+Stock Data Web Scraper - Fast Kernels Module
+Handles compiled numeric kernels for large data frames
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:  # Callers fall back to pandas when numba is not installed
+    njit = None
+
+NUMBA_AVAILABLE = njit is not None
+
+# Matches pandas' _zero_out_fperr: moments this small are floating point noise
+FPERR_TOLERANCE = 1e-14
+
+if NUMBA_AVAILABLE:
+    # No fastmath: it would let the compiler assume NaN never occurs
+    @njit(parallel=True, cache=True)
+    def col_moments(values):
+        """Per-column count, min, max, mean, std, skew and kurtosis in one pass over each column"""
+        n_rows, n_cols = values.shape
+        count = np.zeros(n_cols)
+        minimum = np.full(n_cols, np.nan)
+        maximum = np.full(n_cols, np.nan)
+        mean = np.full(n_cols, np.nan)
+        std = np.full(n_cols, np.nan)
+        skew = np.full(n_cols, np.nan)
+        kurt = np.full(n_cols, np.nan)
+        
+        for col in prange(n_cols):
+            n = 0.0
+            avg = 0.0
+            m2 = 0.0
+            m3 = 0.0
+            m4 = 0.0
+            lo = np.inf
+            hi = -np.inf
+            
+            # Welford-style running updates of the second to fourth central moments
+            for row in range(n_rows):
+                x = values[row, col]
+                if np.isnan(x):
+                    continue
+                
+                n1 = n
+                n += 1.0
+                delta = x - avg
+                delta_n = delta / n
+                delta_n2 = delta_n * delta_n
+                term1 = delta * delta_n * n1
+                avg += delta_n
+                m4 += term1 * delta_n2 * (n * n - 3.0 * n + 3.0) + 6.0 * delta_n2 * m2 - 4.0 * delta_n * m3
+                m3 += term1 * delta_n * (n - 2.0) - 3.0 * delta_n * m2
+                m2 += term1
+                lo = min(lo, x)
+                hi = max(hi, x)
+            
+            count[col] = n
+            if n == 0.0:
+                continue
+            
+            minimum[col] = lo
+            maximum[col] = hi
+            mean[col] = avg
+            
+            if n > 1.0:
+                std[col] = np.sqrt(m2 / (n - 1.0))
+            
+            if abs(m2) < FPERR_TOLERANCE:
+                m2 = 0.0
+            if abs(m3) < FPERR_TOLERANCE:
+                m3 = 0.0
+            
+            # Bias-corrected sample skewness and excess kurtosis, as pandas computes them
+            if n > 2.0:
+                if m2 == 0.0:
+                    skew[col] = 0.0
+                else:
+                    skew[col] = (n * (n - 1.0) ** 0.5 / (n - 2.0)) * (m3 / m2 ** 1.5)
+            
+            if n > 3.0:
+                numerator = n * (n + 1.0) * (n - 1.0) * m4
+                denominator = (n - 2.0) * (n - 3.0) * m2 * m2
+                if abs(numerator) < FPERR_TOLERANCE:
+                    numerator = 0.0
+                if abs(denominator) < FPERR_TOLERANCE:
+                    kurt[col] = 0.0
+                else:
+                    adjustment = 3.0 * (n - 1.0) ** 2 / ((n - 2.0) * (n - 3.0))
+                    kurt[col] = numerator / denominator - adjustment
+        
+        return count, minimum, maximum, mean, std, skew, kurt
+    
+    # error_model='numpy': a zero base gives inf/NaN like pandas instead of raising
+    @njit(parallel=True, cache=True, error_model='numpy')
+    def percent_change(minuend, subtrahend, base):
+        """(minuend - subtrahend) / base * 100 element-wise, fused into a single pass"""
+        n = minuend.shape[0]
+        result = np.empty(n)
+        
+        for i in prange(n):
+            result[i] = (minuend[i] - subtrahend[i]) / base[i] * 100.0
+        
+        return result
+else:
+    col_moments = None
+    percent_change = None
@@ -5,50 +5,190 @@ Handles statistical analysis and data visualization
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler
-from sklearn.decomposition import PCA
 import warnings
 import logging
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
 import os
 
+from ._fastkernels import NUMBA_AVAILABLE, col_moments
+from .storage import load_dataframe
+
 warnings.filterwarnings('ignore')
 logger = logging.getLogger(__name__)
 
+# Below this many rows the compiled kernel's call overhead outweighs the saved passes
+FAST_STATS_MIN_ROWS = 100_000
+
+# Figures are laid out with tight_layout, so skip the extra bbox_inches='tight' render;
+# low PNG compression trades a little file size for much faster encoding
+SAVEFIG_OPTIONS = {'dpi': 300, 'pil_kwargs': {'compress_level': 1}}
+
+# The heatmap only labels cells with at least this absolute correlation
+HEATMAP_ANNOTATE_THRESHOLD = 0.5
+
+# Chart renderers, each an independent StockAnalyzer.create_* method, and the columns each one reads
+# (the heatmap is drawn from the correlation matrix it is handed)
+CHART_COLUMNS = {
+    'price_distribution_chart': ['current_price'],
+    'performance_chart': ['symbol', 'change_percent'],
+    'correlation_heatmap': [],
+    'volume_analysis_chart': ['volume', 'current_price'],
+    'market_cap_analysis': ['market_cap_category', 'change_percent']
+}
+
+def _render_chart(chart_name: str, df: pd.DataFrame, timestamp: str, **chart_kwargs):
+    """Render one chart in a worker process from the columns it needs"""
+    getattr(StockAnalyzer(), f'create_{chart_name}')(df, timestamp, **chart_kwargs)
+
+def _present_values(series: pd.Series) -> np.ndarray:
+    """Float array of a column's non-missing values"""
+    values = series.to_numpy(dtype=float, na_value=np.nan)
+    return values[~np.isnan(values)]
+
+def _plot_histogram(ax, values: np.ndarray, bins: int = 20, **bar_kwargs):
+    """Draw a histogram as bars from a single np.histogram pass"""
+    counts, edges = np.histogram(values, bins=bins)
+    ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge', **bar_kwargs)
+
+PRICE_RANGE_LABELS = ['Very Low', 'Low', 'Medium', 'High', 'Very High']
+
+def _price_range_counts(prices: np.ndarray) -> Dict[str, int]:
+    """Count prices in five equal-width ranges, binned like pd.cut(bins=5), most common first"""
+    counts = np.zeros(len(PRICE_RANGE_LABELS), dtype=np.int64)
+    
+    if len(prices):
+        low, high = prices.min(), prices.max()
+        if low == high:
+            # pd.cut widens a zero-width range by 0.1% on each side
+            low -= 0.001 * abs(low) if low != 0 else 0.001
+            high += 0.001 * abs(high) if high != 0 else 0.001
+        
+        # Right-closed bins: a price on an inner edge belongs to the lower range
+        edges = np.linspace(low, high, len(PRICE_RANGE_LABELS) + 1)
+        counts = np.bincount(np.searchsorted(edges[1:-1], prices, side='left'), minlength=len(PRICE_RANGE_LABELS))
+    
+    order = np.argsort(-counts, kind='stable')
+    return {PRICE_RANGE_LABELS[i]: int(counts[i]) for i in order}
+
+def _select_records(df: pd.DataFrame, positions: np.ndarray, columns: List[str]) -> np.ndarray:
+    """Selected rows as a small structured array instead of a list of per-row dicts"""
+    # symbol stays as objects; numeric columns become floats with NaN for missing values
+    arrays = [
+        df[col].to_numpy()[positions] if col == 'symbol'
+        else df[col].to_numpy(dtype=float, na_value=np.nan)[positions]
+        for col in columns
+    ]
+    return np.rec.fromarrays(arrays, names=columns)
+
+def _top_n_positions(values: np.ndarray, n: int, largest: bool = True) -> np.ndarray:
+    """Positions of the n largest (or smallest) values, best first, matching DataFrame.nlargest"""
+    missing = np.isnan(values)
+    valid = np.flatnonzero(~missing)
+    keys = -values[valid] if largest else values[valid]
+    
+    # Partition in O(n) and only sort the selected few; ties at the cut keep the earliest rows
+    if len(valid) > n:
+        kth = np.partition(keys, n - 1)[n - 1]
+        better = np.flatnonzero(keys < kth)
+        ties = np.flatnonzero(keys == kth)[:n - len(better)]
+        selected = np.concatenate((better, ties))
+    else:
+        selected = np.arange(len(valid))
+    
+    order = valid[selected[np.lexsort((selected, keys[selected]))]]
+    
+    # Like nlargest, pad with NaN rows when there are fewer than n valid values
+    if len(order) < n:
+        order = np.concatenate((order, np.flatnonzero(missing)[:n - len(order)]))
+    
+    return order
+
 class StockAnalyzer:
     """Statistical analysis and visualization class for stock data"""
     
     def __init__(self):
-        self.setup_matplotlib_style()
+        self._load_cache = None
+        self._last_corr = None
+        self._last_change = None
+        self._style_applied = False
         
     def setup_matplotlib_style(self):
         """Setup matplotlib styling"""
-        plt.style.use('seaborn-v0_8')
-        plt.rcParams['figure.figsize'] = (12, 8)
-        plt.rcParams['font.size'] = 10
-        plt.rcParams['axes.titlesize'] = 14
-        plt.rcParams['axes.labelsize'] = 12
-        plt.rcParams['xtick.labelsize'] = 10
-        plt.rcParams['ytick.labelsize'] = 10
-        plt.rcParams['legend.fontsize'] = 10
+        # matplotlib is imported here rather than at module level, so analysis-only runs never load it
+        import matplotlib
+        matplotlib.use('Agg')  # Charts are only written to files, never shown
+        import matplotlib.style
+        matplotlib.style.use('seaborn-v0_8')
+        matplotlib.rcParams['figure.figsize'] = (12, 8)
+        matplotlib.rcParams['font.size'] = 10
+        matplotlib.rcParams['axes.titlesize'] = 14
+        matplotlib.rcParams['axes.labelsize'] = 12
+        matplotlib.rcParams['xtick.labelsize'] = 10
+        matplotlib.rcParams['ytick.labelsize'] = 10
+        matplotlib.rcParams['legend.fontsize'] = 10
+    
+    def _new_figure(self, figsize: Tuple[int, int]):
+        """Create a chart figure, styling matplotlib before the first one"""
+        if not self._style_applied:
+            self.setup_matplotlib_style()
+            self._style_applied = True
+        
+        from matplotlib.figure import Figure
+        return Figure(figsize=figsize)
+        
+    def _load_cached(self, input_file: str) -> pd.DataFrame:
+        """Load a data file, reusing the last parsed DataFrame while the file is unchanged"""
+        stat = os.stat(input_file)
+        key = (os.path.abspath(input_file), stat.st_mtime_ns, stat.st_size)
         
+        # Analysis and visualization read the same file back to back; only parse it once
+        if self._load_cache is None or self._load_cache[0] != key:
+            self._load_cache = (key, load_dataframe(input_file, arrow_strings=True))
+        
+        return self._load_cache[1]
+    
+    def _change_values(self, df: pd.DataFrame) -> Tuple[np.ndarray, float]:
+        """change_percent as a float array plus its standard deviation, computed once per DataFrame"""
+        if self._last_change is None or self._last_change[0] is not df:
+            change = df['change_percent'].to_numpy(dtype=float, na_value=np.nan)
+            present = change[~np.isnan(change)]
+            std = present.std(ddof=1) if len(present) > 1 else np.nan
+            self._last_change = (df, change, std)
+        
+        return self._last_change[1], self._last_change[2]
+    
+    def _correlation_matrix(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Correlation matrix of the numeric columns, computed once per loaded DataFrame"""
+        if self._last_corr is None or self._last_corr[0] is not df:
+            numeric_cols = df.select_dtypes(include=[np.number]).columns
+            self._last_corr = (df, df[numeric_cols].corr())
+        
+        return self._last_corr[1]
+    
     def analyze_data(self, input_file: str) -> Optional[Dict]:
         """Perform comprehensive analysis on stock data"""
         try:
             logger.info(f"Starting analysis of {input_file}")
             
             # Load processed data
-            df = pd.read_csv(input_file)
+            df = self._load_cached(input_file)
             
+        except Exception as e:
+            logger.error(f"Error during analysis: {e}")
+            return None
+        
+        return self.analyze_df(df)
+    
+    def analyze_df(self, df: pd.DataFrame) -> Optional[Dict]:
+        """Perform comprehensive analysis on stock data already in memory"""
+        try:
             if df.empty:
-                logger.warning("Input file is empty")
+                logger.warning("No records to analyze")
                 return None
             
-            logger.info(f"Loaded {len(df)} records for analysis")
+            logger.info(f"Analyzing {len(df)} records")
             
             # Perform various analyses
             analysis_results = {}
@@ -91,22 +231,41 @@ class StockAnalyzer:
         """Calculate descriptive statistics"""
         logger.info("Calculating descriptive statistics")
         
-        numeric_cols = df.select_dtypes(include=[np.number]).columns
+        # All-NaN columns have nothing to describe, so drop them before aggregating
+        numeric_df = df.select_dtypes(include=[np.number])
+        numeric_df = numeric_df.loc[:, numeric_df.notna().any()]
         stats = {}
         
-        for col in numeric_cols:
-            if col in df.columns and df[col].notna().sum() > 0:
-                stats[col] = {
-                    'mean': df[col].mean(),
-                    'median': df[col].median(),
-                    'std': df[col].std(),
-                    'min': df[col].min(),
-                    'max': df[col].max(),
-                    'q25': df[col].quantile(0.25),
-                    'q75': df[col].quantile(0.75),
-                    'skewness': df[col].skew(),
-                    'kurtosis': df[col].kurtosis()
-                }
+        if numeric_df.empty:
+            return stats
+        
+        quantiles = numeric_df.quantile([0.25, 0.5, 0.75])
+        
+        if NUMBA_AVAILABLE and len(numeric_df) >= FAST_STATS_MIN_ROWS:
+            # One compiled pass per column gives every moment at once
+            values = numeric_df.to_numpy(dtype=np.float64, na_value=np.nan)
+            _, minimum, maximum, mean, std, skew, kurt = col_moments(values)
+            desc = pd.DataFrame(
+                [mean, std, minimum, maximum, skew, kurt],
+                index=['mean', 'std', 'min', 'max', 'skew', 'kurt'],
+                columns=numeric_df.columns
+            )
+        else:
+            # One vectorized pass per statistic across all columns instead of per column
+            desc = numeric_df.agg(['mean', 'std', 'min', 'max', 'skew', 'kurt'])
+        
+        for col in numeric_df.columns:
+            stats[col] = {
+                'mean': desc.at['mean', col],
+                'median': quantiles.at[0.5, col],
+                'std': desc.at['std', col],
+                'min': desc.at['min', col],
+                'max': desc.at['max', col],
+                'q25': quantiles.at[0.25, col],
+                'q75': quantiles.at[0.75, col],
+                'skewness': desc.at['skew', col],
+                'kurtosis': desc.at['kurt', col]
+            }
         
         return stats
     
@@ -117,22 +276,29 @@ class StockAnalyzer:
         performance = {}
         
         if 'change_percent' in df.columns:
+            # Read the column into NumPy once and answer every question from that array
+            change, _ = self._change_values(df)
+            top_cols = ['symbol', 'change_percent', 'current_price']
+            
             # Top performers
-            performance['top_gainers'] = df.nlargest(5, 'change_percent')[['symbol', 'change_percent', 'current_price']].to_dict('records')
-            performance['top_losers'] = df.nsmallest(5, 'change_percent')[['symbol', 'change_percent', 'current_price']].to_dict('records')
+            performance['top_gainers'] = _select_records(df, _top_n_positions(change, 5), top_cols)
+            performance['top_losers'] = _select_records(df, _top_n_positions(change, 5, largest=False), top_cols)
             
-            # Performance distribution
-            performance['positive_stocks'] = len(df[df['change_percent'] > 0])
-            performance['negative_stocks'] = len(df[df['change_percent'] < 0])
-            performance['neutral_stocks'] = len(df[df['change_percent'] == 0])
+            # Performance distribution: one bincount over the signs (-1, 0, 1) of the present values
+            signs = np.sign(change[~np.isnan(change)]).astype(np.int8) + 1
+            negative, neutral, positive = np.bincount(signs, minlength=3)
+            performance['positive_stocks'] = int(positive)
+            performance['negative_stocks'] = int(negative)
+            performance['neutral_stocks'] = int(neutral)
             
             # Average performance
-            performance['avg_change_percent'] = df['change_percent'].mean()
-            performance['median_change_percent'] = df['change_percent'].median()
+            performance['avg_change_percent'] = np.nanmean(change)
+            performance['median_change_percent'] = np.nanmedian(change)
         
         if 'volume' in df.columns:
             # Volume analysis
-            performance['high_volume_stocks'] = df.nlargest(5, 'volume')[['symbol', 'volume', 'current_price']].to_dict('records')
+            volume = df['volume'].to_numpy(dtype=float, na_value=np.nan)
+            performance['high_volume_stocks'] = _select_records(df, _top_n_positions(volume, 5), ['symbol', 'volume', 'current_price'])
             performance['avg_volume'] = df['volume'].mean()
         
         return performance
@@ -141,23 +307,26 @@ class StockAnalyzer:
         """Analyze correlations between variables"""
         logger.info("Analyzing correlations")
         
-        numeric_cols = df.select_dtypes(include=[np.number]).columns
-        correlation_matrix = df[numeric_cols].corr()
+        correlation_matrix = self._correlation_matrix(df)
         
         correlations = {}
         correlations['correlation_matrix'] = correlation_matrix.to_dict()
         
-        # Find strong correlations
-        strong_correlations = []
-        for i in range(len(correlation_matrix.columns)):
-            for j in range(i+1, len(correlation_matrix.columns)):
-                corr_value = correlation_matrix.iloc[i, j]
-                if abs(corr_value) > 0.7:  # Strong correlation threshold
-                    strong_correlations.append({
-                        'variable1': correlation_matrix.columns[i],
-                        'variable2': correlation_matrix.columns[j],
-                        'correlation': corr_value
-                    })
+        # Find strong correlations from the upper triangle in one NumPy pass
+        values = correlation_matrix.to_numpy()
+        columns = correlation_matrix.columns.to_numpy()
+        rows, cols = np.triu_indices(len(columns), k=1)
+        pair_values = values[rows, cols]
+        strong = np.abs(pair_values) > 0.7  # Strong correlation threshold
+        
+        strong_correlations = [
+            {
+                'variable1': columns[i],
+                'variable2': columns[j],
+                'correlation': corr_value
+            }
+            for i, j, corr_value in zip(rows[strong], cols[strong], pair_values[strong].tolist())
+        ]
         
         correlations['strong_correlations'] = strong_correlations
         
@@ -182,12 +351,22 @@ class StockAnalyzer:
             logger.warning("Insufficient data points for clustering")
             return {'error': 'Insufficient data points for clustering'}
         
-        # Standardize data
-        scaler = StandardScaler()
-        scaled_data = scaler.fit_transform(cluster_data)
-        
-        # Perform K-means clustering
-        kmeans = KMeans(n_clusters=3, random_state=42, n_init=10)
+        # Standardize in float32 (as StandardScaler does: population std, constant columns left unscaled)
+        values = cluster_data.to_numpy(dtype=np.float32)
+        mean = values.mean(axis=0, dtype=np.float64)
+        std = values.std(axis=0, dtype=np.float64)
+        std[std == 0] = 1.0
+        scaled_data = ((values - mean) / std).astype(np.float32)
+        
+        from sklearn.cluster import MiniBatchKMeans
+        
+        # Perform K-means clustering on mini-batches instead of full passes over every point
+        kmeans = MiniBatchKMeans(
+            n_clusters=3,
+            random_state=42,
+            n_init=3,
+            batch_size=min(256, len(scaled_data))
+        )
         cluster_labels = kmeans.fit_predict(scaled_data)
         
         # Add cluster labels to original data
@@ -227,8 +406,7 @@ class StockAnalyzer:
         
         # Price range analysis
         if 'current_price' in df.columns:
-            price_ranges = pd.cut(df['current_price'], bins=5, labels=['Very Low', 'Low', 'Medium', 'High', 'Very High'])
-            segments['price_range_distribution'] = price_ranges.value_counts().to_dict()
+            segments['price_range_distribution'] = _price_range_counts(_present_values(df['current_price']))
         
         return segments
     
@@ -239,41 +417,46 @@ class StockAnalyzer:
         risk_metrics = {}
         
         if 'change_percent' in df.columns:
+            # Shares the array read by analyze_performance
+            change, std = self._change_values(df)
+            
             # Volatility analysis
-            risk_metrics['volatility'] = df['change_percent'].std()
-            risk_metrics['var_95'] = df['change_percent'].quantile(0.05)  # Value at Risk (95%)
-            risk_metrics['max_drawdown'] = df['change_percent'].min()
+            risk_metrics['volatility'] = std
+            risk_metrics['var_95'] = np.nanquantile(change, 0.05)  # Value at Risk (95%)
+            risk_metrics['max_drawdown'] = np.nanmin(change)
             
             # Risk categorization
-            high_risk_stocks = df[df['change_percent'].abs() > df['change_percent'].std() * 2]
-            risk_metrics['high_risk_stocks'] = high_risk_stocks[['symbol', 'change_percent']].to_dict('records')
+            high_risk = np.flatnonzero(np.abs(change) > std * 2)
+            risk_metrics['high_risk_stocks'] = _select_records(df, high_risk, ['symbol', 'change_percent'])
         
         return risk_metrics
     
     def create_analysis_summary(self, df: pd.DataFrame, analysis_results: Dict) -> pd.DataFrame:
         """Create summary dataframe from analysis results"""
-        summary_data = []
-        
-        for index, row in df.iterrows():
-            summary_row = {
-                'symbol': row.get('symbol', ''),
-                'current_price': row.get('current_price', 0),
-                'change_percent': row.get('change_percent', 0),
-                'volume': row.get('volume', 0),
-                'market_cap_category': row.get('market_cap_category', ''),
-                'performance_category': row.get('performance_category', ''),
-                'timestamp': row.get('timestamp', '')
-            }
-            summary_data.append(summary_row)
-        
-        return pd.DataFrame(summary_data)
+        # Columns missing from the input are filled with the same defaults as before
+        summary_columns = {
+            'symbol': '',
+            'current_price': 0,
+            'change_percent': 0,
+            'volume': 0,
+            'market_cap_category': '',
+            'performance_category': '',
+            'timestamp': ''
+        }
+        
+        summary_df = pd.DataFrame(
+            {col: df[col] if col in df.columns else default for col, default in summary_columns.items()},
+            index=df.index
+        )
+        
+        return summary_df.reset_index(drop=True)
     
     def generate_visualizations(self, input_file: str) -> bool:
         """Generate comprehensive visualizations"""
         try:
             logger.info(f"Generating visualizations for {input_file}")
             
-            df = pd.read_csv(input_file)
+            df = self._load_cached(input_file)
             
             if df.empty:
                 logger.warning("Input file is empty")
@@ -281,12 +464,24 @@ class StockAnalyzer:
             
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             
-            # Create visualizations
-            self.create_price_distribution_chart(df, timestamp)
-            self.create_performance_chart(df, timestamp)
-            self.create_correlation_heatmap(df, timestamp)
-            self.create_volume_analysis_chart(df, timestamp)
-            self.create_market_cap_analysis(df, timestamp)
+            # The heatmap reuses the matrix from analyze_data when the same file was analyzed
+            chart_kwargs = {'correlation_heatmap': {'corr': self._correlation_matrix(df)}}
+            
+            # Charts do not depend on each other, so render them in parallel processes; the file is
+            # parsed once here and each worker is sent only its chart's columns
+            with ProcessPoolExecutor(max_workers=min(len(CHART_COLUMNS), os.cpu_count() or 1)) as executor:
+                futures = [
+                    executor.submit(
+                        _render_chart,
+                        chart_name,
+                        df[[col for col in columns if col in df.columns]],
+                        timestamp,
+                        **chart_kwargs.get(chart_name, {})
+                    )
+                    for chart_name, columns in CHART_COLUMNS.items()
+                ]
+                for future in futures:
+                    future.result()
             
             logger.info("All visualizations generated successfully")
             return True
@@ -300,24 +495,26 @@ class StockAnalyzer:
         if 'current_price' not in df.columns:
             return
         
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
+        fig = self._new_figure((15, 6))
+        ax1, ax2 = fig.subplots(1, 2)
+        
+        prices = _present_values(df['current_price'])
         
         # Histogram
-        ax1.hist(df['current_price'].dropna(), bins=20, alpha=0.7, edgecolor='black')
+        _plot_histogram(ax1, prices, alpha=0.7, edgecolor='black')
         ax1.set_title('Stock Price Distribution')
         ax1.set_xlabel('Current Price ($)')
         ax1.set_ylabel('Frequency')
         ax1.grid(True, alpha=0.3)
         
         # Box plot
-        ax2.boxplot(df['current_price'].dropna())
+        ax2.boxplot(prices)
         ax2.set_title('Stock Price Box Plot')
         ax2.set_ylabel('Current Price ($)')
         ax2.grid(True, alpha=0.3)
         
-        plt.tight_layout()
-        plt.savefig(f'price_distribution_{timestamp}.png', dpi=300, bbox_inches='tight')
-        plt.close()
+        fig.tight_layout()
+        fig.savefig(f'price_distribution_{timestamp}.png', **SAVEFIG_OPTIONS)
         
         logger.info(f"Price distribution chart saved as price_distribution_{timestamp}.png")
     
@@ -326,11 +523,14 @@ class StockAnalyzer:
         if 'change_percent' not in df.columns:
             return
         
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
+        fig = self._new_figure((15, 6))
+        ax1, ax2 = fig.subplots(1, 2)
+        
+        changes = _present_values(df['change_percent'])
         
         # Performance histogram
-        ax1.hist(df['change_percent'].dropna(), bins=20, alpha=0.7, edgecolor='black', 
-                color='green' if df['change_percent'].mean() > 0 else 'red')
+        _plot_histogram(ax1, changes, alpha=0.7, edgecolor='black',
+                        color='green' if changes.mean() > 0 else 'red')
         ax1.axvline(x=0, color='black', linestyle='--', alpha=0.5)
         ax1.set_title('Stock Performance Distribution')
         ax1.set_xlabel('Change Percentage (%)')
@@ -345,28 +545,36 @@ class StockAnalyzer:
         ax2.set_xlabel('Change Percentage (%)')
         ax2.grid(True, alpha=0.3)
         
-        plt.tight_layout()
-        plt.savefig(f'performance_analysis_{timestamp}.png', dpi=300, bbox_inches='tight')
-        plt.close()
+        fig.tight_layout()
+        fig.savefig(f'performance_analysis_{timestamp}.png', **SAVEFIG_OPTIONS)
         
         logger.info(f"Performance chart saved as performance_analysis_{timestamp}.png")
     
-    def create_correlation_heatmap(self, df: pd.DataFrame, timestamp: str):
+    def create_correlation_heatmap(self, df: pd.DataFrame, timestamp: str, corr: Optional[pd.DataFrame] = None):
         """Create correlation heatmap"""
-        numeric_cols = df.select_dtypes(include=[np.number]).columns
+        correlation_matrix = corr if corr is not None else self._correlation_matrix(df)
         
-        if len(numeric_cols) < 2:
+        if len(correlation_matrix.columns) < 2:
             return
         
-        correlation_matrix = df[numeric_cols].corr()
+        matrix = correlation_matrix.to_numpy()
+        labels = correlation_matrix.columns
+        
+        # One image for the whole matrix; only strong correlations get a text label
+        fig = self._new_figure((12, 10))
+        ax = fig.subplots()
+        image = ax.imshow(matrix, cmap='coolwarm', vmin=-1, vmax=1)
+        ax.set_xticks(range(len(labels)), labels=labels, rotation=90)
+        ax.set_yticks(range(len(labels)), labels=labels)
+        ax.grid(False)
+        fig.colorbar(image, ax=ax, shrink=0.8)
+        
+        for row, col in np.argwhere(np.abs(matrix) > HEATMAP_ANNOTATE_THRESHOLD):
+            ax.text(col, row, f'{matrix[row, col]:.2f}', ha='center', va='center')
         
-        plt.figure(figsize=(12, 10))
-        sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', center=0,
-                   square=True, fmt='.2f', cbar_kws={'shrink': 0.8})
-        plt.title('Stock Data Correlation Matrix')
-        plt.tight_layout()
-        plt.savefig(f'correlation_heatmap_{timestamp}.png', dpi=300, bbox_inches='tight')
-        plt.close()
+        ax.set_title('Stock Data Correlation Matrix')
+        fig.tight_layout()
+        fig.savefig(f'correlation_heatmap_{timestamp}.png', **SAVEFIG_OPTIONS)
         
         logger.info(f"Correlation heatmap saved as correlation_heatmap_{timestamp}.png")
     
@@ -375,7 +583,8 @@ class StockAnalyzer:
         if 'volume' not in df.columns or 'current_price' not in df.columns:
             return
         
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
+        fig = self._new_figure((15, 6))
+        ax1, ax2 = fig.subplots(1, 2)
         
         # Volume vs Price scatter
         ax1.scatter(df['volume'], df['current_price'], alpha=0.6)
@@ -385,15 +594,14 @@ class StockAnalyzer:
         ax1.grid(True, alpha=0.3)
         
         # Volume distribution
-        ax2.hist(df['volume'].dropna(), bins=20, alpha=0.7, edgecolor='black')
+        _plot_histogram(ax2, _present_values(df['volume']), alpha=0.7, edgecolor='black')
         ax2.set_xlabel('Volume')
         ax2.set_ylabel('Frequency')
         ax2.set_title('Trading Volume Distribution')
         ax2.grid(True, alpha=0.3)
         
-        plt.tight_layout()
-        plt.savefig(f'volume_analysis_{timestamp}.png', dpi=300, bbox_inches='tight')
-        plt.close()
+        fig.tight_layout()
+        fig.savefig(f'volume_analysis_{timestamp}.png', **SAVEFIG_OPTIONS)
         
         logger.info(f"Volume analysis chart saved as volume_analysis_{timestamp}.png")
     
@@ -402,7 +610,8 @@ class StockAnalyzer:
         if 'market_cap_category' not in df.columns:
             return
         
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
+        fig = self._new_figure((15, 6))
+        ax1, ax2 = fig.subplots(1, 2)
         
         # Market cap distribution pie chart
         market_cap_counts = df['market_cap_category'].value_counts()
@@ -411,16 +620,26 @@ class StockAnalyzer:
         
         # Market cap vs performance
         if 'change_percent' in df.columns:
-            market_cap_performance = df.groupby('market_cap_category')['change_percent'].mean()
-            ax2.bar(market_cap_performance.index, market_cap_performance.values)
+            # Low-cardinality groups: average with bincount over category codes, no hashing
+            categories = df['market_cap_category'].astype('category').cat
+            codes = categories.codes.to_numpy()
+            change = df['change_percent'].to_numpy(dtype=float, na_value=np.nan)
+            valid = (codes >= 0) & ~np.isnan(change)
+            
+            n_categories = len(categories.categories)
+            sums = np.bincount(codes[valid], weights=change[valid], minlength=n_categories)
+            counts = np.bincount(codes[valid], minlength=n_categories)
+            with np.errstate(invalid='ignore'):
+                means = sums / counts
+            
+            ax2.bar(categories.categories, means)
             ax2.set_title('Average Performance by Market Cap')
             ax2.set_xlabel('Market Cap Category')
             ax2.set_ylabel('Average Change (%)')
             ax2.tick_params(axis='x', rotation=45)
         
-        plt.tight_layout()
-        plt.savefig(f'market_cap_analysis_{timestamp}.png', dpi=300, bbox_inches='tight')
-        plt.close()
+        fig.tight_layout()
+        fig.savefig(f'market_cap_analysis_{timestamp}.png', **SAVEFIG_OPTIONS)
         
         logger.info(f"Market cap analysis chart saved as market_cap_analysis_{timestamp}.png")
     
@@ -440,13 +659,15 @@ class StockAnalyzer:
             
             if 'top_gainers' in perf:
                 report.append("Top Gainers:")
-                for gainer in perf['top_gainers']:
-                    report.append(f"  {gainer['symbol']}: {gainer['change_percent']:.2f}%")
+                gainers = perf['top_gainers']
+                for symbol, change in zip(gainers['symbol'], gainers['change_percent']):
+                    report.append(f"  {symbol}: {change:.2f}%")
             
             if 'top_losers' in perf:
                 report.append("\nTop Losers:")
-                for loser in perf['top_losers']:
-                    report.append(f"  {loser['symbol']}: {loser['change_percent']:.2f}%")
+                losers = perf['top_losers']
+                for symbol, change in zip(losers['symbol'], losers['change_percent']):
+                    report.append(f"  {symbol}: {change:.2f}%")
             
             report.append("")
         
@@ -4,6 +4,7 @@ Handles application configuration and settings
 """
 
 import os
+from functools import cached_property
 from typing import List, Dict, Any
 
 class Config:
@@ -19,7 +20,14 @@ class Config:
         # Scraping settings
         self.REQUEST_TIMEOUT = 10
         self.RETRY_ATTEMPTS = 3
-        self.DELAY_BETWEEN_REQUESTS = 2
+        self.RETRY_BACKOFF = 0.5  # Seconds, doubled after each failed attempt
+        self.RETRY_MAX_WAIT = 8
+        self.MAX_CONCURRENCY = 20  # Concurrent requests before Yahoo starts answering 429
+        self.REQUEST_RATE = 5.0  # Sustained requests per second, enforced by a token bucket
+        self.REQUEST_BURST = 10  # Requests allowed at once before the rate applies
+        self.USE_HTTP2 = True  # Multiplex async requests over HTTP/2 when httpx and h2 are installed
+        self.RECORD_CACHE_TTL = 30  # Seconds a scraped record is reused for repeated symbols
+        self.RECORD_CACHE_SIZE = 2048
         self.SELENIUM_TIMEOUT = 10
         
         # Data processing settings
@@ -30,6 +38,12 @@ class Config:
         self.DATA_DIRECTORY = 'data'
         self.LOG_DIRECTORY = 'logs'
         self.OUTPUT_DIRECTORY = 'output'
+        self.RAW_DATASET_DIRECTORY = os.path.join(self.DATA_DIRECTORY, 'raw')
+        
+        # Raw dumps are only handed to the processor, so use memory-mappable Arrow IPC
+        self.RAW_DATA_FORMAT = 'arrow'
+        self.PROCESSED_DATA_FORMAT = 'parquet'
+        self.EXPORT_CSV_COPY = False  # Also write scheduled results as CSV, for reading by hand
         
         # Email settings (for notifications)
         self.SMTP_SERVER = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
@@ -37,11 +51,16 @@ class Config:
         self.EMAIL_ADDRESS = os.getenv('EMAIL_ADDRESS')
         self.EMAIL_PASSWORD = os.getenv('EMAIL_PASSWORD')
         
-        # Create directories if they don't exist
+        # Directories are created on first access to self.directories, not on construction
+    
+    @cached_property
+    def directories(self) -> List[str]:
+        """Data, log and output directories, created on first access"""
         self.create_directories()
+        return [self.DATA_DIRECTORY, self.LOG_DIRECTORY, self.OUTPUT_DIRECTORY]
     
     def create_directories(self):
-        """Create necessary directories"""
+        """Create necessary directories, leaving existing ones alone"""
         directories = [
             self.DATA_DIRECTORY,
             self.LOG_DIRECTORY,
@@ -49,8 +68,7 @@ class Config:
         ]
         
         for directory in directories:
-            if not os.path.exists(directory):
-                os.makedirs(directory)
+            os.makedirs(directory, exist_ok=True)
     
     def get_user_agent(self) -> str:
         """Get user agent string"""
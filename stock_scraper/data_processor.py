@@ -10,25 +10,67 @@ import re
 from typing import Optional, Dict, List
 from datetime import datetime
 
+from ._fastkernels import NUMBA_AVAILABLE, percent_change
+from .storage import ARROW_AVAILABLE, load_dataframe, null_counts, preview_dataframe
+
 logger = logging.getLogger(__name__)
 
+# Text columns are kept in contiguous string buffers rather than as Python objects
+TEXT_DTYPE = 'string[pyarrow]' if ARROW_AVAILABLE else 'string'
+
+# Below this many rows pandas' three vectorized passes beat the compiled kernel's call overhead
+FAST_DERIVED_MIN_ROWS = 100_000
+
+def _category_from_codes(codes: np.ndarray, labels: List[str], index: pd.Index) -> pd.Series:
+    """Categorical from label codes, with categories in order of first appearance so value_counts ties keep row order"""
+    order = pd.unique(codes)
+    remap = np.empty(len(labels), dtype=np.int8)
+    remap[order] = np.arange(len(order))
+    categorical = pd.Categorical.from_codes(remap[codes], categories=[labels[code] for code in order])
+    return pd.Series(categorical, index=index)
+
 class DataProcessor:
     """Data processing and cleaning class"""
     
+    # Currency symbols, commas, parentheses and anything else that is not part of a number
+    NUMERIC_STRIP_PATTERN = re.compile(r'[^\d.-]')
+    
+    # Volumes such as "1,234,567", "12.5M" or "3.2 B": the number and an optional K/M/B suffix
+    VOLUME_PATTERN = re.compile(r'([\d.]+)\s*([KMB]?)')
+    VOLUME_MULTIPLIERS = {'': 1, 'K': 1000, 'M': 1000000, 'B': 1000000000}
+    
+    # Missing-value strategies: prices carry the previous row forward, changes default to 0
+    FORWARD_FILL_COLUMNS = ['current_price', 'previous_close', 'open']
+    ZERO_FILL_COLUMNS = ['change', 'change_percent']
+    
+    # Placeholders quote pages show for missing text, read as missing whatever format the data came in
+    MISSING_TEXT_VALUES = ['', 'N/A', '--']
+    
+    # Company names often carry the stock symbol in parentheses, e.g. "Apple Inc. (AAPL)"
+    COMPANY_SYMBOL_PATTERN = re.compile(r'\([^)]*\)')
+    
+    # Right-closed change_percent ranges: above 5 is Strong Positive, above 2 Positive, and so on
+    PERFORMANCE_BINS = [-5, -2, 2, 5]
+    PERFORMANCE_LABELS = ['Strong Negative', 'Negative', 'Neutral', 'Positive', 'Strong Positive', 'Unknown']
+    
+    # Market cap suffixes in precedence order, e.g. "2.5T" is Mega Cap; labels are indexed by code
+    MARKET_CAP_SUFFIXES = ['T', 'B', 'M']
+    MARKET_CAP_LABELS = ['Mega Cap', 'Large Cap', 'Mid Cap', 'Small Cap', 'Unknown']
+    
     def __init__(self):
         self.numeric_columns = [
             'current_price', 'change', 'change_percent', 'previous_close',
             'open', 'day_low', 'day_high', 'week_52_low', 'week_52_high',
             'pe_ratio', 'eps'
         ]
-        
+    
     def process_data(self, input_file: str) -> Optional[pd.DataFrame]:
         """Process raw stock data"""
         try:
             logger.info(f"Processing data from {input_file}")
             
-            # Load raw data
-            df = pd.read_csv(input_file)
+            # Load raw data, text columns straight into Arrow string buffers
+            df = load_dataframe(input_file, arrow_strings=True)
             
             if df.empty:
                 logger.warning("Input file is empty")
@@ -36,7 +78,25 @@ class DataProcessor:
             
             logger.info(f"Loaded {len(df)} records from {input_file}")
             
-            # Clean and process data
+        except Exception as e:
+            logger.error(f"Error processing data: {e}")
+            return None
+        
+        # The frame was loaded for this call only, so the stages may work on it directly
+        return self.process_df(df, inplace=True)
+    
+    def process_df(self, df: pd.DataFrame, inplace: bool = False) -> Optional[pd.DataFrame]:
+        """Process raw stock data already in memory, on a copy unless inplace is set"""
+        try:
+            if df.empty:
+                logger.warning("No records to process")
+                return None
+            
+            # The stages drop rows and overwrite columns, so keep the caller's frame intact
+            if not inplace:
+                df = df.copy()
+            
+            # Clean and process data; each stage updates the frame in place
             df_processed = self.clean_data(df)
             df_processed = self.standardize_formats(df_processed)
             df_processed = self.handle_missing_values(df_processed)
@@ -45,81 +105,89 @@ class DataProcessor:
             logger.info(f"Processing completed. Final dataset has {len(df_processed)} records")
             
             return df_processed
-            
+        
         except Exception as e:
             logger.error(f"Error processing data: {e}")
             return None
     
     def clean_data(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Clean raw data"""
-        df_clean = df.copy()
+        """Clean raw data in place and return it"""
+        df_clean = df
         
         # Remove rows with errors
         if 'error' in df_clean.columns:
-            df_clean = df_clean[df_clean['error'].isna()]
-        
-        # Clean numeric columns
-        for col in self.numeric_columns:
-            if col in df_clean.columns:
-                df_clean[col] = df_clean[col].apply(self.clean_numeric_value)
+            failed = df_clean['error'].notna().to_numpy()
+            if failed.any():
+                df_clean.drop(index=df_clean.index[failed], inplace=True)
+        
+        # Clean numeric columns, all of them with one vectorized strip-and-parse each;
+        # columns a Parquet/Arrow file already stores as float64 need no conversion pass
+        numeric_cols = [
+            col for col in self.numeric_columns
+            if col in df_clean.columns and df_clean[col].dtype != np.float64
+        ]
+        if numeric_cols:
+            df_clean[numeric_cols] = df_clean[numeric_cols].apply(self.clean_numeric_series)
         
         # Clean volume column
-        if 'volume' in df_clean.columns:
-            df_clean['volume'] = df_clean['volume'].apply(self.clean_volume_value)
+        if 'volume' in df_clean.columns and df_clean['volume'].dtype != 'Int64':
+            df_clean['volume'] = self.clean_volume_series(df_clean['volume'])
         
-        # Clean market cap column
+        # Clean market cap column (the original format is kept, only trimmed)
         if 'market_cap' in df_clean.columns:
-            df_clean['market_cap'] = df_clean['market_cap'].apply(self.clean_market_cap_value)
+            market_cap = df_clean['market_cap'].astype(TEXT_DTYPE).str.strip()
+            df_clean['market_cap'] = market_cap.mask(market_cap.isin(self.MISSING_TEXT_VALUES))
         
-        # Clean company names
+        # Clean company names; missing ones are filled from the symbol later
         if 'company_name' in df_clean.columns:
-            df_clean['company_name'] = df_clean['company_name'].apply(self.clean_company_name)
+            company_name = (
+                df_clean['company_name'].astype(TEXT_DTYPE)
+                .str.replace(self.COMPANY_SYMBOL_PATTERN, '', regex=True)
+                .str.strip()
+            )
+            df_clean['company_name'] = company_name.mask(company_name.isin(self.MISSING_TEXT_VALUES))
         
         logger.info(f"Data cleaning completed. {len(df_clean)} records remaining")
         
         return df_clean
     
     def standardize_formats(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Standardize data formats"""
-        df_std = df.copy()
+        """Standardize data formats in place and return the frame"""
+        df_std = df
         
-        # Standardize timestamp format
-        if 'timestamp' in df_std.columns:
+        # Standardize timestamp format (Arrow's CSV reader already parses ISO timestamps)
+        if 'timestamp' in df_std.columns and not pd.api.types.is_datetime64_any_dtype(df_std['timestamp']):
             df_std['timestamp'] = pd.to_datetime(df_std['timestamp'])
         
-        # Ensure numeric columns are float type
-        for col in self.numeric_columns:
-            if col in df_std.columns:
-                df_std[col] = pd.to_numeric(df_std[col], errors='coerce')
-        
-        # Convert volume to integer
-        if 'volume' in df_std.columns:
-            df_std['volume'] = pd.to_numeric(df_std['volume'], errors='coerce').astype('Int64')
-        
-        # Add processing timestamp
-        df_std['processed_at'] = datetime.now()
+        # Add processing timestamp as a datetime64 scalar, so the column is raw int64 rather than objects
+        df_std['processed_at'] = np.datetime64(datetime.now(), 'ns')
         
         logger.info("Data format standardization completed")
         
         return df_std
     
     def handle_missing_values(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Handle missing values in the dataset"""
-        df_filled = df.copy()
+        """Handle missing values in the dataset, in place"""
+        df_filled = df
         
-        # Fill missing values with appropriate strategies
+        # Fill missing values with appropriate strategies, one column group at a time
         numeric_cols = df_filled.select_dtypes(include=[np.number]).columns
+        price_cols = [col for col in numeric_cols if col in self.FORWARD_FILL_COLUMNS]
+        change_cols = [col for col in numeric_cols if col in self.ZERO_FILL_COLUMNS]
+        other_cols = [col for col in numeric_cols if col not in price_cols and col not in change_cols]
+        
+        # Use forward fill for price columns
+        if price_cols:
+            df_filled[price_cols] = df_filled[price_cols].ffill()
+        
+        # Fill with 0 for change columns
+        if change_cols:
+            df_filled[change_cols] = df_filled[change_cols].fillna(0)
         
-        for col in numeric_cols:
-            if col in ['current_price', 'previous_close', 'open']:
-                # Use forward fill for price columns
-                df_filled[col] = df_filled[col].fillna(method='ffill')
-            elif col in ['change', 'change_percent']:
-                # Fill with 0 for change columns
-                df_filled[col] = df_filled[col].fillna(0)
-            else:
-                # Use median for other numeric columns
-                df_filled[col] = df_filled[col].fillna(df_filled[col].median())
+        # Use median for other numeric columns, computed only where something is missing
+        other_cols = [col for col in other_cols if df_filled[col].hasnans]
+        if other_cols:
+            df_filled[other_cols] = df_filled[other_cols].fillna(df_filled[other_cols].median())
         
         # Fill missing company names
         if 'company_name' in df_filled.columns:
@@ -130,173 +198,119 @@ class DataProcessor:
         return df_filled
     
     def add_derived_metrics(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Add derived metrics and features"""
-        df_derived = df.copy()
+        """Add derived metrics and features to the frame in place"""
+        df_derived = df
         
         # Calculate price momentum
         if 'current_price' in df_derived.columns and 'previous_close' in df_derived.columns:
-            df_derived['price_momentum'] = (
-                (df_derived['current_price'] - df_derived['previous_close']) / 
-                df_derived['previous_close'] * 100
+            df_derived['price_momentum'] = self.percent_difference(
+                df_derived, 'current_price', 'previous_close', 'previous_close'
             )
         
         # Calculate volatility indicator
         if 'day_high' in df_derived.columns and 'day_low' in df_derived.columns:
-            df_derived['daily_volatility'] = (
-                (df_derived['day_high'] - df_derived['day_low']) / 
-                df_derived['current_price'] * 100
+            df_derived['daily_volatility'] = self.percent_difference(
+                df_derived, 'day_high', 'day_low', 'current_price'
             )
         
         # Add market cap category
         if 'market_cap' in df_derived.columns:
-            df_derived['market_cap_category'] = df_derived['market_cap'].apply(
-                self.categorize_market_cap
-            )
+            df_derived['market_cap_category'] = self.categorize_market_cap(df_derived['market_cap'])
         
         # Add performance category
         if 'change_percent' in df_derived.columns:
-            df_derived['performance_category'] = df_derived['change_percent'].apply(
-                self.categorize_performance
-            )
+            df_derived['performance_category'] = self.categorize_performance(df_derived['change_percent'])
         
         logger.info("Derived metrics calculation completed")
         
         return df_derived
     
-    def clean_numeric_value(self, value) -> Optional[float]:
-        """Clean numeric values"""
-        if pd.isna(value):
-            return None
-        
-        if isinstance(value, (int, float)):
-            return float(value)
-        
-        if isinstance(value, str):
-            # Remove currency symbols, commas, and parentheses
-            cleaned = re.sub(r'[^\d.-]', '', value)
-            try:
-                return float(cleaned) if cleaned else None
-            except ValueError:
-                return None
-        
-        return None
+    def percent_difference(self, df: pd.DataFrame, minuend: str, subtrahend: str, base: str) -> pd.Series:
+        """(minuend - subtrahend) / base * 100 over three columns"""
+        if NUMBA_AVAILABLE and len(df) >= FAST_DERIVED_MIN_ROWS:
+            # One compiled pass instead of a temporary array for each of the three operations
+            columns = [df[col].to_numpy(dtype=np.float64, na_value=np.nan) for col in (minuend, subtrahend, base)]
+            return pd.Series(percent_change(*columns), index=df.index)
+        
+        return (df[minuend] - df[subtrahend]) / df[base] * 100
     
-    def clean_volume_value(self, value) -> Optional[int]:
-        """Clean volume values"""
-        if pd.isna(value):
-            return None
-        
-        if isinstance(value, (int, float)):
-            return int(value)
-        
-        if isinstance(value, str):
-            # Handle K, M, B suffixes
-            multipliers = {'K': 1000, 'M': 1000000, 'B': 1000000000}
-            
-            value_upper = value.upper().replace(',', '')
-            
-            for suffix, multiplier in multipliers.items():
-                if suffix in value_upper:
-                    try:
-                        number = float(value_upper.replace(suffix, ''))
-                        return int(number * multiplier)
-                    except ValueError:
-                        return None
-            
-            # No suffix
-            try:
-                return int(float(re.sub(r'[^\d.]', '', value)))
-            except ValueError:
-                return None
-        
-        return None
+    def clean_numeric_series(self, series: pd.Series) -> pd.Series:
+        """Convert a whole column of numeric text to float, stripping currency symbols, commas and parentheses"""
+        if pd.api.types.is_numeric_dtype(series):
+            return series.astype(float)
+        
+        # Unparseable or empty strings (and missing values, which become 'nan'/'None') end up NaN
+        cleaned = series.astype(str).str.replace(self.NUMERIC_STRIP_PATTERN, '', regex=True)
+        return pd.to_numeric(cleaned, errors='coerce').astype(float)
     
-    def clean_market_cap_value(self, value) -> Optional[str]:
-        """Clean market cap values"""
-        if pd.isna(value):
-            return None
+    def clean_volume_series(self, series: pd.Series) -> pd.Series:
+        """Clean a whole volume column, expanding K/M/B suffixes, as nullable integers"""
+        if pd.api.types.is_numeric_dtype(series):
+            return np.trunc(series.astype(float)).astype('Int64')
         
-        if isinstance(value, str):
-            # Keep original format for market cap
-            return value.strip()
+        # One regex pass splits every cell into number and suffix; cells without a number become NA
+        parts = series.astype(str).str.upper().str.replace(',', '', regex=False).str.extract(self.VOLUME_PATTERN)
+        numbers = pd.to_numeric(parts[0], errors='coerce')
+        multipliers = parts[1].map(self.VOLUME_MULTIPLIERS)
         
-        return str(value)
+        return np.trunc(numbers * multipliers).astype('Int64')
     
-    def clean_company_name(self, value) -> Optional[str]:
-        """Clean company names"""
-        if pd.isna(value):
-            return None
-        
-        if isinstance(value, str):
-            # Remove extra whitespace and common suffixes
-            name = value.strip()
-            # Remove stock symbol in parentheses
-            name = re.sub(r'\([^)]*\)', '', name).strip()
-            return name
-        
-        return str(value)
-    
-    def categorize_market_cap(self, market_cap) -> str:
-        """Categorize market cap into size categories"""
-        if pd.isna(market_cap):
-            return 'Unknown'
-        
-        if isinstance(market_cap, str):
-            if 'T' in market_cap:
-                return 'Mega Cap'
-            elif 'B' in market_cap:
-                return 'Large Cap'
-            elif 'M' in market_cap:
-                return 'Mid Cap'
-            else:
-                return 'Small Cap'
-        
-        return 'Unknown'
+    def categorize_market_cap(self, market_cap: pd.Series) -> pd.Series:
+        """Categorize market caps into size categories"""
+        unknown = self.MARKET_CAP_LABELS.index('Unknown')
+        if not pd.api.types.is_string_dtype(market_cap.dtype):
+            return _category_from_codes(np.full(len(market_cap), unknown, dtype=np.int8), self.MARKET_CAP_LABELS, market_cap.index)
+        
+        # Label codes are chosen directly, so no string array is built per row
+        strings = market_cap.str
+        codes = np.select(
+            [strings.contains(suffix, regex=False, na=False).to_numpy(dtype=bool) for suffix in self.MARKET_CAP_SUFFIXES],
+            np.arange(len(self.MARKET_CAP_SUFFIXES), dtype=np.int8),
+            default=np.int8(len(self.MARKET_CAP_SUFFIXES))
+        ).astype(np.int8)
+        
+        # Missing and non-text values have no size category
+        codes[strings.len().isna().to_numpy()] = unknown
+        return _category_from_codes(codes, self.MARKET_CAP_LABELS, market_cap.index)
     
-    def categorize_performance(self, change_percent) -> str:
+    def categorize_performance(self, change_percent: pd.Series) -> pd.Series:
         """Categorize performance based on change percentage"""
-        if pd.isna(change_percent):
-            return 'Unknown'
-        
-        if change_percent > 5:
-            return 'Strong Positive'
-        elif change_percent > 2:
-            return 'Positive'
-        elif change_percent > -2:
-            return 'Neutral'
-        elif change_percent > -5:
-            return 'Negative'
-        else:
-            return 'Strong Negative'
+        values = change_percent.to_numpy(dtype=np.float64, na_value=np.nan)
+        
+        # side='left' counts the bin edges below each value, which makes the ranges right-closed
+        codes = np.searchsorted(self.PERFORMANCE_BINS, values, side='left').astype(np.int8)
+        codes[np.isnan(values)] = self.PERFORMANCE_LABELS.index('Unknown')
+        return _category_from_codes(codes, self.PERFORMANCE_LABELS, change_percent.index)
     
     def preview_data(self, filename: str, rows: int = 10):
         """Preview data file"""
         try:
-            df = pd.read_csv(filename)
+            # Only the previewed rows are parsed; the total comes from file metadata or a line count
+            df, total_rows = preview_dataframe(filename, rows)
             print(f"\n--- Data Preview: {filename} ---")
-            print(f"Shape: {df.shape}")
+            print(f"Shape: {(total_rows, len(df.columns))}")
             print(f"Columns: {list(df.columns)}")
             print(f"\nFirst {rows} rows:")
             print(df.head(rows))
             print(f"\nData types:")
             print(df.dtypes)
-            
+        
         except Exception as e:
             print(f"Error previewing data: {e}")
     
-    def get_data_quality_report(self, df: pd.DataFrame) -> Dict:
+    def get_data_quality_report(self, df: pd.DataFrame, include_numeric_summary: bool = False) -> Dict:
         """Generate data quality report"""
         report = {
             'total_records': len(df),
             'total_columns': len(df.columns),
-            'missing_values': df.isnull().sum().to_dict(),
-            'duplicate_records': df.duplicated().sum(),
+            'missing_values': null_counts(df),
+            'duplicate_records': int(df.duplicated().sum()),
             'data_types': df.dtypes.to_dict()
         }
         
-        # Add numeric statistics
+        # Add numeric statistics; describe() makes eight passes over every numeric column
         numeric_cols = df.select_dtypes(include=[np.number]).columns
-        if len(numeric_cols) > 0:
+        if include_numeric_summary and len(numeric_cols) > 0:
             report['numeric_summary'] = df[numeric_cols].describe().to_dict()
         
         return report
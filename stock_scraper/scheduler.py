@@ -4,7 +4,6 @@ Handles scheduling and automation of data collection
 """
 
 import schedule
-import time
 import logging
 from datetime import datetime, timedelta
 from typing import Callable, List, Optional
@@ -12,20 +11,46 @@ import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import threading
+import queue
+import atexit
+import copy
 import json
 import os
 
 logger = logging.getLogger(__name__)
 
+# The mail thread reuses its SMTP connection for notifications sent close together
+# and logs out once none has been queued for this long
+SMTP_IDLE_TIMEOUT = 60
+SMTP_TIMEOUT = 30
+
+# Longest shutdown waits for queued notifications to go out
+MAIL_DRAIN_TIMEOUT = 120
+
+# Longest the scheduler thread sleeps, so jobs added while it waits are picked up
+SCHEDULER_MAX_SLEEP = 60
+
+# Market hours collection runs at open, midday and close (EST) on weekdays
+MARKET_LAST_WEEKDAY = 4  # Friday, as numbered by datetime.weekday()
+MARKET_HOURS = ('09:30', '12:00', '15:30')
+
 class SchedulerManager:
     """Handles scheduling and automation of data collection"""
     
+    # Parsed config file shared by every manager, re-read only when the file changes
+    _config_cache = None
+    
     def __init__(self):
         self.is_running = False
         self.scheduler_thread = None
-        self.jobs = []
+        self._stop_event = threading.Event()  # Wakes the scheduler thread on stop
+        self.jobs = {}  # Job descriptions keyed by the schedule tag of their jobs
         self.config = self.load_config()
         
+        # Notifications are sent by a background thread so jobs never wait on SMTP
+        self._mail_queue = queue.Queue()
+        self._mail_thread = None
+        
     def load_config(self) -> dict:
         """Load scheduler configuration"""
         config_file = 'scheduler_config.json'
@@ -40,8 +65,15 @@ class SchedulerManager:
         
         if os.path.exists(config_file):
             try:
-                with open(config_file, 'r') as f:
-                    return json.load(f)
+                stat = os.stat(config_file)
+                key = (os.path.abspath(config_file), stat.st_mtime_ns, stat.st_size)
+                
+                if SchedulerManager._config_cache is None or SchedulerManager._config_cache[0] != key:
+                    with open(config_file, 'r') as f:
+                        SchedulerManager._config_cache = (key, json.load(f))
+                
+                # Managers edit their config, so each one gets its own copy
+                return copy.deepcopy(SchedulerManager._config_cache[1])
             except Exception as e:
                 logger.error(f"Error loading config: {e}")
                 return default_config
@@ -67,8 +99,11 @@ class SchedulerManager:
         def job():
             self.collect_and_process_data(symbols)
         
-        schedule.every().day.at(time_str).do(job)
-        self.jobs.append(f"Daily collection at {time_str}")
+        # Scheduling a kind of job again replaces it rather than running it twice
+        tag = f"daily_{time_str}"
+        schedule.clear(tag)
+        schedule.every().day.at(time_str).do(job).tag(tag)
+        self.jobs[tag] = f"Daily collection at {time_str}"
         logger.info(f"Scheduled daily collection at {time_str}")
     
     def schedule_market_hours_collection(self, symbols: List[str] = None):
@@ -77,28 +112,16 @@ class SchedulerManager:
             symbols = self.config['default_symbols']
         
         def job():
-            self.collect_and_process_data(symbols)
+            # One daily job per slot instead of one per weekday; weekend runs are skipped here
+            if datetime.now().weekday() <= MARKET_LAST_WEEKDAY:
+                self.collect_and_process_data(symbols)
         
         # Schedule for market open, midday, and close (EST)
-        schedule.every().monday.at("09:30").do(job)
-        schedule.every().tuesday.at("09:30").do(job)
-        schedule.every().wednesday.at("09:30").do(job)
-        schedule.every().thursday.at("09:30").do(job)
-        schedule.every().friday.at("09:30").do(job)
-        
-        schedule.every().monday.at("12:00").do(job)
-        schedule.every().tuesday.at("12:00").do(job)
-        schedule.every().wednesday.at("12:00").do(job)
-        schedule.every().thursday.at("12:00").do(job)
-        schedule.every().friday.at("12:00").do(job)
-        
-        schedule.every().monday.at("15:30").do(job)
-        schedule.every().tuesday.at("15:30").do(job)
-        schedule.every().wednesday.at("15:30").do(job)
-        schedule.every().thursday.at("15:30").do(job)
-        schedule.every().friday.at("15:30").do(job)
-        
-        self.jobs.append("Market hours collection (9:30 AM, 12:00 PM, 3:30 PM EST)")
+        schedule.clear('market_hours')
+        for time_str in MARKET_HOURS:
+            schedule.every().day.at(time_str).do(job).tag('market_hours')
+        
+        self.jobs['market_hours'] = "Market hours collection (9:30 AM, 12:00 PM, 3:30 PM EST)"
         logger.info("Scheduled market hours collection")
     
     def schedule_hourly_collection(self, symbols: List[str] = None):
@@ -109,8 +132,9 @@ class SchedulerManager:
         def job():
             self.collect_and_process_data(symbols)
         
-        schedule.every().hour.do(job)
-        self.jobs.append("Hourly collection")
+        schedule.clear('hourly')
+        schedule.every().hour.do(job).tag('hourly')
+        self.jobs['hourly'] = "Hourly collection"
         logger.info("Scheduled hourly collection")
     
     def collect_and_process_data(self, symbols: List[str]):
@@ -119,33 +143,49 @@ class SchedulerManager:
             from .scraper import StockScraper
             from .data_processor import DataProcessor
             from .analyzer import StockAnalyzer
+            from .config import Config
+            from .storage import append_to_dataset, save_dataframe, write_csv
             
             logger.info(f"Starting scheduled data collection for {symbols}")
             
             # Initialize components
-            scraper = StockScraper()
             processor = DataProcessor()
             analyzer = StockAnalyzer()
             
-            # Collect data
-            raw_data = scraper.scrape_multiple_stocks(symbols)
+            # Collect data; the scraper's connections are released as soon as it is done.
+            # Unattended runs are spaced well beyond the caches' lifetimes, so skip them
+            with StockScraper(use_cache=False) as scraper:
+                raw_data = scraper.scrape_concurrently(symbols)
             
             if raw_data is not None:
-                # Save raw data
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                raw_filename = f"scheduled_raw_data_{timestamp}.csv"
-                raw_data.to_csv(raw_filename, index=False)
+                # Append raw data to the collection dataset instead of a new CSV per run
+                config = Config()
+                config.directories  # Creates the data, log and output directories
+                
+                now = datetime.now()
+                timestamp = now.strftime("%Y%m%d_%H%M%S")
+                append_to_dataset(
+                    raw_data,
+                    config.RAW_DATASET_DIRECTORY,
+                    now.strftime("%Y-%m-%d"),
+                    f"scheduled_raw_data_{timestamp}"
+                )
                 
-                # Process data
-                processed_data = processor.process_data(raw_filename)
+                # Process data in memory rather than reading back the file just written
+                processed_data = processor.process_df(raw_data)
                 
                 if processed_data is not None:
-                    # Save processed data
-                    processed_filename = f"scheduled_processed_data_{timestamp}.csv"
-                    processed_data.to_csv(processed_filename, index=False)
+                    # Save processed data, once, for the chart workers and later runs
+                    processed_filename = save_dataframe(
+                        processed_data,
+                        f"scheduled_processed_data_{timestamp}",
+                        config.PROCESSED_DATA_FORMAT
+                    )
+                    if config.EXPORT_CSV_COPY and not processed_filename.endswith('.csv'):
+                        write_csv(processed_data, f"scheduled_processed_data_{timestamp}.csv")
                     
                     # Analyze data
-                    analysis_results = analyzer.analyze_data(processed_filename)
+                    analysis_results = analyzer.analyze_df(processed_data)
                     
                     # Generate visualizations
                     analyzer.generate_visualizations(processed_filename)
@@ -201,20 +241,7 @@ class SchedulerManager:
                         body += f"  {gainer['symbol']}: {gainer['change_percent']:.2f}%\n"
             
             # Send email
-            msg = MIMEMultipart()
-            msg['From'] = self.config['email_address']
-            msg['To'] = self.config['email_address']
-            msg['Subject'] = subject
-            
-            msg.attach(MIMEText(body, 'plain'))
-            
-            server = smtplib.SMTP(self.config['smtp_server'], self.config['smtp_port'])
-            server.starttls()
-            server.login(self.config['email_address'], self.config['email_password'])
-            server.send_message(msg)
-            server.quit()
-            
-            logger.info("Email notification sent successfully")
+            self.queue_email(subject, body, "Email notification sent successfully")
             
         except Exception as e:
             logger.error(f"Error sending email notification: {e}")
@@ -238,24 +265,93 @@ class SchedulerManager:
             Please check the logs for more details.
             """
             
-            msg = MIMEMultipart()
-            msg['From'] = self.config['email_address']
-            msg['To'] = self.config['email_address']
-            msg['Subject'] = subject
-            
-            msg.attach(MIMEText(body, 'plain'))
-            
-            server = smtplib.SMTP(self.config['smtp_server'], self.config['smtp_port'])
-            server.starttls()
-            server.login(self.config['email_address'], self.config['email_password'])
-            server.send_message(msg)
-            server.quit()
-            
-            logger.info("Error notification sent")
+            self.queue_email(subject, body, "Error notification sent")
             
         except Exception as e:
             logger.error(f"Error sending error notification: {e}")
     
+    def queue_email(self, subject: str, body: str, sent_message: str):
+        """Hand an email to the mail thread, starting it on first use, and return immediately"""
+        msg = MIMEMultipart()
+        msg['From'] = self.config['email_address']
+        msg['To'] = self.config['email_address']
+        msg['Subject'] = subject
+        
+        msg.attach(MIMEText(body, 'plain'))
+        
+        if self._mail_thread is None or not self._mail_thread.is_alive():
+            self._mail_thread = threading.Thread(target=self._mail_loop, daemon=True)
+            self._mail_thread.start()
+            # The thread is a daemon, so send what is still queued before the interpreter exits
+            atexit.register(self.flush_notifications)
+        
+        self._mail_queue.put((msg, sent_message))
+    
+    def flush_notifications(self):
+        """Send every queued email, then stop the mail thread and close its connection"""
+        if self._mail_thread is None or not self._mail_thread.is_alive():
+            return
+        
+        # Emails queued before the stop marker still go out first
+        self._mail_queue.put(None)
+        self._mail_thread.join(MAIL_DRAIN_TIMEOUT)
+        
+        if self._mail_thread.is_alive():
+            logger.warning(f"Mail thread still busy after {MAIL_DRAIN_TIMEOUT}s, {self._mail_queue.qsize()} emails not sent")
+    
+    def _connect_smtp(self) -> smtplib.SMTP:
+        """Open and authenticate an SMTP connection"""
+        server = smtplib.SMTP(self.config['smtp_server'], self.config['smtp_port'], timeout=SMTP_TIMEOUT)
+        server.starttls()
+        server.login(self.config['email_address'], self.config['email_password'])
+        return server
+    
+    def _close_smtp(self, server: Optional[smtplib.SMTP]):
+        """Log out of an SMTP connection, if there is one, ignoring a server that already dropped it"""
+        if server is not None:
+            try:
+                server.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+    
+    def _mail_loop(self):
+        """Send queued emails, reusing one SMTP connection while busy, until a None entry stops the thread"""
+        server = None
+        
+        while True:
+            try:
+                item = self._mail_queue.get(timeout=SMTP_IDLE_TIMEOUT)
+            except queue.Empty:
+                # Idle: log out rather than hold an authenticated session open indefinitely
+                self._close_smtp(server)
+                server = None
+                continue
+            
+            if item is None:
+                self._close_smtp(server)
+                self._mail_queue.task_done()
+                return
+            
+            msg, sent_message = item
+            try:
+                if server is None:
+                    server = self._connect_smtp()
+                
+                try:
+                    server.send_message(msg)
+                except smtplib.SMTPServerDisconnected:
+                    # The server closed the connection since the last message; reconnect once
+                    server = self._connect_smtp()
+                    server.send_message(msg)
+                
+                logger.info(sent_message)
+                
+            except Exception as e:
+                logger.error(f"Error sending email: {e}")
+                server = None
+            finally:
+                self._mail_queue.task_done()
+    
     def start_scheduler(self):
         """Start the scheduler in a separate thread"""
         if self.is_running:
@@ -263,11 +359,16 @@ class SchedulerManager:
             return
         
         self.is_running = True
+        self._stop_event.clear()
         
         def run_scheduler():
             while self.is_running:
                 schedule.run_pending()
-                time.sleep(60)  # Check every minute
+                
+                # Sleep until the next job is due instead of polling every minute
+                idle = schedule.idle_seconds()
+                wait = SCHEDULER_MAX_SLEEP if idle is None else min(max(idle, 0), SCHEDULER_MAX_SLEEP)
+                self._stop_event.wait(wait)
         
         self.scheduler_thread = threading.Thread(target=run_scheduler)
         self.scheduler_thread.daemon = True
@@ -278,23 +379,39 @@ class SchedulerManager:
     def stop_scheduler(self):
         """Stop the scheduler"""
         self.is_running = False
+        self._stop_event.set()
         if self.scheduler_thread:
             self.scheduler_thread.join()
         
+        # Notifications from the last jobs (error reports especially) are sent before returning
+        self.flush_notifications()
+        
         logger.info("Scheduler stopped")
     
-    def clear_jobs(self):
-        """Clear all scheduled jobs"""
-        schedule.clear()
-        self.jobs = []
-        logger.info("All scheduled jobs cleared")
+    def clear_jobs(self, tag: Optional[str] = None):
+        """Clear all scheduled jobs, or only those with the given tag"""
+        schedule.clear(tag)
+        
+        if tag is None:
+            self.jobs = {}
+            logger.info("All scheduled jobs cleared")
+        else:
+            self.jobs.pop(tag, None)
+            logger.info(f"Scheduled jobs tagged {tag} cleared")
     
     def get_job_status(self) -> dict:
         """Get current job status"""
+        next_runs = {}
+        for job in schedule.get_jobs():
+            for tag in job.tags:
+                if tag not in next_runs or job.next_run < next_runs[tag]:
+                    next_runs[tag] = job.next_run
+        
         return {
             'is_running': self.is_running,
-            'jobs': self.jobs,
-            'next_run': str(schedule.next_run()) if schedule.jobs else None
+            'jobs': list(self.jobs.values()),
+            'next_run': str(schedule.next_run()) if schedule.jobs else None,
+            'next_runs': {tag: str(next_run) for tag, next_run in next_runs.items()}
         }
     
     def setup_scheduler_interactive(self):
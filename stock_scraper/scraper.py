@@ -3,40 +3,251 @@ Stock Data Web Scraper - Main Scraping Module
 Handles data extraction from multiple financial websites
 """
 
+import asyncio
 import requests
 import time
-import random
 import logging
+import threading
+import multiprocessing.util
+import numpy as np
 import pandas as pd
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, WebDriverException
+from bs4 import BeautifulSoup, SoupStrainer
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+from urllib3.util.retry import Retry
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import cached_property
+from itertools import repeat
 from typing import List, Dict, Optional, Union
 import re
-from datetime import datetime
+from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
+from .config import Config
+
+try:
+    import aiohttp
+except ImportError:  # Fall back to the threaded requests path
+    aiohttp = None
+
+try:
+    import httpx
+    import h2
+except ImportError:  # HTTP/2 needs httpx with h2; aiohttp serves the async path over HTTP/1.1 without them
+    httpx = None
+
+try:
+    import requests_cache
+except ImportError:  # Caching is optional; use a plain session without it
+    requests_cache = None
+
+try:
+    from orjson import loads as json_loads
+except ImportError:  # orjson parses several times faster; the stdlib parser accepts the same bytes
+    from json import loads as json_loads
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # selectolax's lexbor parser is the fastest; BeautifulSoup handles pages without it
+    LexborHTMLParser = None
+
+try:
+    import lxml
+except ImportError:  # lxml parses in C; html.parser is the slower pure-Python fallback
+    lxml = None
+
+ASYNC_HTTP_AVAILABLE = aiohttp is not None or httpx is not None
+HTTP2_AVAILABLE = httpx is not None
+HTML_PARSER = 'lxml' if lxml is not None else 'html.parser'
+
+# Yahoo quotes change quickly, so cached pages are only reused briefly
+CACHE_NAME = '.stock_cache'
+CACHE_EXPIRE_AFTER = timedelta(minutes=5)
+
+# Quote pages are mostly scripts, styles and layout; only these elements go into the parse tree
+PAGE_STRAINER = SoupStrainer(['fin-streamer', 'h1', 'table'])
+
+# Live quote fields rendered as <fin-streamer data-field=...> and the record keys they fill
+STREAMER_FIELDS = {
+    'regularMarketPrice': 'current_price',
+    'regularMarketChange': 'change',
+    'regularMarketChangePercent': 'change_percent'
+}
+
+# Yahoo's quote API returns a whole batch of symbols as one small JSON document
+QUOTE_API_URL = 'https://query1.finance.yahoo.com/v7/finance/quote'
+QUOTE_BATCH_SIZE = 100
+
+# Quote API fields and the record keys the HTML scraper produces for them
+QUOTE_FIELDS = {
+    'regularMarketPrice': 'current_price',
+    'regularMarketChange': 'change',
+    'regularMarketChangePercent': 'change_percent',
+    'regularMarketPreviousClose': 'previous_close',
+    'regularMarketOpen': 'open',
+    'trailingPE': 'pe_ratio'
+}
+
+# Market caps are kept in the page's suffixed text form, e.g. "2.913T", which the processor categorizes
+MARKET_CAP_SCALES = [(1e12, 'T'), (1e9, 'B'), (1e6, 'M')]
+
+# Summary table labels, without any trailing "(...)" qualifier, and the record keys they fill
+SUMMARY_FIELDS = {
+    'Previous Close': 'previous_close',
+    'Open': 'open',
+    'Volume': 'volume',
+    'Market Cap': 'market_cap',
+    'PE Ratio': 'pe_ratio',
+    'P/E Ratio': 'pe_ratio'
+}
+
+# Every key a stock data record can carry, in output column order; prices, scraped as text
+# or returned as numbers, become float64, the rest stay as scraped (e.g. volume "12.5M")
+RECORD_COLUMNS = (
+    'symbol', 'source', 'current_price', 'change', 'change_percent', 'previous_close',
+    'open', 'volume', 'market_cap', 'pe_ratio', 'company_name', 'timestamp', 'error'
+)
+FLOAT_COLUMNS = frozenset(['current_price', 'change', 'change_percent', 'previous_close', 'open', 'pe_ratio'])
+
+# Fields of the record returned for a symbol no source could fetch
+FAILED_RECORD_TEMPLATE = {
+    'current_price': None,
+    'change': None,
+    'change_percent': None,
+    'error': 'Could not fetch data'
+}
+
+# Compressions every HTTP client here decodes; urllib3 lists "br" only when brotli is installed,
+# and requests' session already advertises the same list by default
+ACCEPT_ENCODING = ', '.join(
+    encoding for encoding in make_headers(accept_encoding=True)['accept-encoding'].split(',')
+    if encoding in ('gzip', 'deflate', 'br')
+)
+
+# Throttling and server-side failures are worth retrying; other errors are not
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Strips currency symbols, commas, percent signs and parentheses from scraped numbers
+NUMBER_STRIP_PATTERN = re.compile(r'[^0-9.-]')
+
+# Exceptions the async clients raise for failed requests
+ASYNC_REQUEST_ERRORS = (asyncio.TimeoutError,)
+if aiohttp is not None:
+    ASYNC_REQUEST_ERRORS += (aiohttp.ClientError,)
+if httpx is not None:
+    ASYNC_REQUEST_ERRORS += (httpx.HTTPError,)
+
 logger = logging.getLogger(__name__)
 
+def _unique_symbols(symbols: List[str]) -> List[str]:
+    """Upper-case symbols and drop blanks and duplicates, keeping the given order, so each is fetched once"""
+    return list(dict.fromkeys(s.strip().upper() for s in symbols if s.strip()))
+
+def _response_status(error: Exception) -> Optional[int]:
+    """HTTP status of a failed async request, or None for connection errors and timeouts"""
+    if aiohttp is not None and isinstance(error, aiohttp.ClientResponseError):
+        return error.status
+    if httpx is not None and isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code
+    return None
+
+# Scraper of a Selenium worker process; each worker owns one Chrome since WebDriver is not thread-safe
+_worker_scraper = None
+
+def _init_selenium_worker(rate: float, burst: int):
+    """Start a worker process's scraper, limited to its share of the request rate, and quit its Chrome at shutdown"""
+    global _worker_scraper
+    _worker_scraper = StockScraper(use_cache=False)
+    _worker_scraper.rate_limiter = TokenBucket(rate, burst)
+    multiprocessing.util.Finalize(None, _worker_scraper.close, exitpriority=10)
+
+def _scrape_with_selenium(symbol: str, timestamp: Optional[str] = None) -> Dict:
+    """Scrape one symbol with the worker process's browser"""
+    return _worker_scraper.scrape_with_selenium(symbol, timestamp)
+
+class TokenBucket:
+    """Rate limiter letting short bursts through while holding requests to a steady rate"""
+    
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()  # Shared by the thread pool workers
+    
+    def _reserve(self) -> float:
+        """Take a token and return how long to wait until it is due"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            
+            # Tokens may go negative: each caller queues behind the ones already waiting
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+    
+    def acquire(self):
+        """Block the calling thread until a request may be sent"""
+        wait = self._reserve()
+        if wait:
+            time.sleep(wait)
+    
+    async def acquire_async(self):
+        """Wait, without blocking the event loop, until a request may be sent"""
+        wait = self._reserve()
+        if wait:
+            await asyncio.sleep(wait)
+
 class StockScraper:
-    """Main scraping class for stock data collection"""
+    """Main scraping class for stock data collection; use it in a with block to release its connections and browser"""
     
-    def __init__(self):
-        self.session = requests.Session()
+    def __init__(self, use_cache: bool = True):
+        self.config = Config()
+        self.use_cache = use_cache
+        self.cache_enabled = use_cache and requests_cache is not None
+        if self.cache_enabled:
+            # Cache 404s too: unknown symbols are common and refetching them is pure waste
+            self.session = requests_cache.CachedSession(
+                cache_name=CACHE_NAME,
+                backend='sqlite',
+                expire_after=CACHE_EXPIRE_AFTER,
+                allowable_codes=(200, 404)
+            )
+        else:
+            self.session = requests.Session()
+        
+        # One pooled connection per concurrent worker, so warm connections are reused rather than reopened
+        adapter = HTTPAdapter(
+            pool_connections=self.config.MAX_CONCURRENCY,
+            pool_maxsize=self.config.MAX_CONCURRENCY,
+            max_retries=Retry(
+                total=self.config.RETRY_ATTEMPTS - 1,
+                backoff_factor=self.config.RETRY_BACKOFF,
+                status_forcelist=RETRY_STATUSES,
+                raise_on_status=False
+            )
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.rate_limiter = TokenBucket(self.config.REQUEST_RATE, self.config.REQUEST_BURST)
+        self._record_cache = OrderedDict()  # symbol -> (expiry, record), least recently used first
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
-        self.driver = None
-        self.setup_selenium()
+    
+    @cached_property
+    def driver(self):
+        """Selenium WebDriver, started on first use since HTTP scrapes never need Chrome"""
+        return self.setup_selenium()
         
     def setup_selenium(self):
         """Setup Selenium WebDriver with options"""
         try:
+            from selenium import webdriver
+            from selenium.webdriver.chrome.options import Options
+            
             chrome_options = Options()
             chrome_options.add_argument('--headless')  # Run in background
             chrome_options.add_argument('--no-sandbox')
@@ -47,170 +258,500 @@ class StockScraper:
             chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
             chrome_options.add_experimental_option('useAutomationExtension', False)
             
-            self.driver = webdriver.Chrome(options=chrome_options)
-            self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+            driver = webdriver.Chrome(options=chrome_options)
+            driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
             logger.info("Selenium WebDriver initialized successfully")
+            return driver
             
         except Exception as e:
             logger.warning(f"Selenium setup failed: {e}. Will use requests only.")
-            self.driver = None
+            return None
             
-    def scrape_yahoo_finance(self, symbol: str) -> Dict:
+    def scrape_with_selenium(self, symbol: str, timestamp: Optional[str] = None) -> Dict:
+        """Scrape a quote page rendered by headless Chrome, for pages that need JavaScript"""
+        if self.driver is None:
+            return {'symbol': symbol, 'source': 'yahoo', 'error': 'Selenium WebDriver not available'}
+        
+        try:
+            from selenium.webdriver.common.by import By
+            from selenium.webdriver.support import expected_conditions as EC
+            from selenium.webdriver.support.ui import WebDriverWait
+            
+            self.rate_limiter.acquire()
+            self.driver.get(f"https://finance.yahoo.com/quote/{symbol}")
+            WebDriverWait(self.driver, self.config.SELENIUM_TIMEOUT).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, 'fin-streamer[data-field="regularMarketPrice"]'))
+            )
+            
+            return self.parse_yahoo_finance(symbol, self.driver.page_source, timestamp)
+            
+        except Exception as e:
+            logger.error(f"Error scraping {symbol} with Selenium: {e}")
+            return {'symbol': symbol, 'source': 'yahoo', 'error': str(e)}
+    
+    def scrape_yahoo_finance(self, symbol: str, timestamp: Optional[str] = None) -> Dict:
         """Scrape stock data from Yahoo Finance"""
         try:
             url = f"https://finance.yahoo.com/quote/{symbol}"
-            response = self.session.get(url, timeout=10)
+            self.rate_limiter.acquire()
+            response = self.session.get(url, timeout=self.config.REQUEST_TIMEOUT)
             response.raise_for_status()
+            logger.debug(f"{url} served with Content-Encoding {response.headers.get('Content-Encoding')}")
             
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            data = {'symbol': symbol, 'source': 'yahoo'}
+            return self.parse_yahoo_finance(symbol, response.content, timestamp)
             
-            # Extract current price
-            price_element = soup.find('fin-streamer', {'data-field': 'regularMarketPrice'})
-            if price_element:
-                data['current_price'] = self.clean_price(price_element.get_text())
+        except Exception as e:
+            logger.error(f"Error scraping {symbol} from Yahoo Finance: {e}")
+            return {'symbol': symbol, 'source': 'yahoo', 'error': str(e)}
+    
+    def parse_yahoo_finance(self, symbol: str, content: Union[str, bytes], timestamp: Optional[str] = None) -> Dict:
+        """Parse a Yahoo Finance quote page into a stock data record, stamped with timestamp or the current time"""
+        if LexborHTMLParser is not None:
+            data = self.parse_yahoo_finance_fast(symbol, content, timestamp)
+            if data is not None:
+                return data
+        
+        soup = BeautifulSoup(content, HTML_PARSER, parse_only=PAGE_STRAINER)
+        
+        data = {'symbol': symbol, 'source': 'yahoo'}
+        
+        # Extract price, change and percentage in one pass over the streamers, keeping each field's first
+        # (numbers stay page text; _build_dataframe converts a whole batch at once)
+        for streamer in soup.find_all('fin-streamer', attrs={'data-field': STREAMER_FIELDS.keys()}):
+            key = STREAMER_FIELDS[streamer['data-field']]
+            if key not in data:
+                data[key] = streamer.get_text()
+        
+        # Extract additional data from summary table
+        summary_data = self.extract_yahoo_summary_data(soup)
+        data.update(summary_data)
+        
+        # Extract company name
+        name_element = soup.find('h1', {'data-reactid': True})
+        if name_element:
+            data['company_name'] = name_element.get_text().split('(')[0].strip()
+        
+        data['timestamp'] = timestamp or datetime.now().isoformat()
+        logger.info(f"Successfully scraped {symbol} from Yahoo Finance")
+        
+        return data
+    
+    def parse_yahoo_finance_fast(self, symbol: str, content: Union[str, bytes], timestamp: Optional[str] = None) -> Optional[Dict]:
+        """Parse a quote page with selectolax, or return None to leave a page without a price to BeautifulSoup"""
+        tree = LexborHTMLParser(content)
+        
+        data = {'symbol': symbol, 'source': 'yahoo'}
+        
+        # Same fields as the BeautifulSoup parser: the first streamer per field, then summary rows by label
+        for streamer in tree.css('fin-streamer[data-field]'):
+            key = STREAMER_FIELDS.get(streamer.attributes.get('data-field'))
+            if key is not None and key not in data:
+                data[key] = streamer.text()
+        
+        if 'current_price' not in data:
+            return None
+        
+        # The whole tree is kept here, so rows can be scoped to the quote summary container when it exists
+        rows = tree.css('div[data-test="quote-summary"] tr') or tree.css('tr')
+        for row in rows:
+            cells = row.css('td')
+            if len(cells) < 2:
+                continue
             
-            # Extract change and percentage
-            change_element = soup.find('fin-streamer', {'data-field': 'regularMarketChange'})
-            if change_element:
-                data['change'] = self.clean_price(change_element.get_text())
+            field = SUMMARY_FIELDS.get(cells[0].text().strip().split(' (')[0])
+            if field is not None:
+                data[field] = cells[1].text().strip()
+        
+        name_element = tree.css_first('h1[data-reactid]')
+        if name_element is not None:
+            data['company_name'] = name_element.text().split('(')[0].strip()
+        
+        data['timestamp'] = timestamp or datetime.now().isoformat()
+        logger.info(f"Successfully scraped {symbol} from Yahoo Finance")
+        
+        return data
+    
+    def scrape_yahoo_quote_batch(self, symbols: List[str], timestamp: Optional[str] = None) -> Dict[str, Dict]:
+        """Fetch symbols from Yahoo's quote API, a batch per request; symbols it misses are left out"""
+        quotes = {}
+        for start in range(0, len(symbols), QUOTE_BATCH_SIZE):
+            batch = symbols[start:start + QUOTE_BATCH_SIZE]
+            try:
+                self.rate_limiter.acquire()
+                response = self.session.get(
+                    QUOTE_API_URL, params={'symbols': ','.join(batch)}, timeout=self.config.REQUEST_TIMEOUT
+                )
+                response.raise_for_status()
+                quotes.update(self.parse_quote_response(response.content, timestamp))
                 
-            change_percent_element = soup.find('fin-streamer', {'data-field': 'regularMarketChangePercent'})
-            if change_percent_element:
-                data['change_percent'] = self.clean_percentage(change_percent_element.get_text())
+            except Exception as e:
+                logger.warning(f"Quote API request failed ({e}), scraping {len(batch)} quote pages instead")
+        
+        return quotes
+    
+    def parse_quote_response(self, content: Union[str, bytes], timestamp: Optional[str] = None) -> Dict[str, Dict]:
+        """Map a quote API response onto stock data records keyed by symbol"""
+        quotes = {}
+        timestamp = timestamp or datetime.now().isoformat()
+        
+        for quote in json_loads(content)['quoteResponse']['result']:
+            # Quotes without a price (e.g. unknown symbols) are left to the page scraper
+            if quote.get('regularMarketPrice') is None:
+                continue
             
-            # Extract additional data from summary table
-            summary_data = self.extract_yahoo_summary_data(soup)
-            data.update(summary_data)
+            data = {'symbol': quote['symbol'], 'source': 'yahoo'}
+            for field, key in QUOTE_FIELDS.items():
+                if quote.get(field) is not None:
+                    data[key] = quote[field]
             
-            # Extract company name
-            name_element = soup.find('h1', {'data-reactid': True})
-            if name_element:
-                data['company_name'] = name_element.get_text().split('(')[0].strip()
+            # Volume stays text like the page's, so a mixed batch still makes one string column
+            if quote.get('regularMarketVolume') is not None:
+                data['volume'] = str(quote['regularMarketVolume'])
             
-            data['timestamp'] = datetime.now().isoformat()
-            logger.info(f"Successfully scraped {symbol} from Yahoo Finance")
+            if quote.get('marketCap') is not None:
+                data['market_cap'] = self.format_market_cap(quote['marketCap'])
             
-            return data
+            name = quote.get('longName') or quote.get('shortName')
+            if name:
+                data['company_name'] = name
+            
+            data['timestamp'] = timestamp
+            quotes[quote['symbol']] = data
+        
+        logger.info(f"Fetched {len(quotes)} quotes from the Yahoo Finance quote API")
+        
+        return quotes
+    
+    def format_market_cap(self, market_cap: float) -> str:
+        """Format a market cap the way quote pages show it, e.g. 2913000000000 as 2.913T"""
+        for scale, suffix in MARKET_CAP_SCALES:
+            if market_cap >= scale:
+                return f"{market_cap / scale:.3f}{suffix}"
+        return f"{market_cap:,.0f}"
+    
+    async def _fetch_one(self, session, symbol: str, timestamp: Optional[str] = None) -> Dict:
+        """Fetch and parse a single symbol on a shared async client"""
+        try:
+            content = await self._get_with_retry(session, f"https://finance.yahoo.com/quote/{symbol}")
+            
+            # Parse on a worker thread so other responses keep streaming in meanwhile
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, self.parse_yahoo_finance, symbol, content, timestamp)
             
         except Exception as e:
             logger.error(f"Error scraping {symbol} from Yahoo Finance: {e}")
             return {'symbol': symbol, 'source': 'yahoo', 'error': str(e)}
     
-    def scrape_multiple_stocks(self, symbols: List[str]) -> Optional[pd.DataFrame]:
-        """Scrape data for multiple stocks"""
+    async def _get_once(self, session, url: str) -> bytes:
+        """GET a page on either async client, raising its error for a failed request"""
+        if aiohttp is not None and isinstance(session, aiohttp.ClientSession):
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=self.config.REQUEST_TIMEOUT)) as response:
+                response.raise_for_status()
+                return await response.read()
+        
+        response = await session.get(url)
+        response.raise_for_status()
+        return response.content
+    
+    async def _get_with_retry(self, session, url: str) -> bytes:
+        """GET a page, retrying throttled and transient failures with exponential backoff"""
+        for attempt in range(1, self.config.RETRY_ATTEMPTS + 1):
+            try:
+                await self.rate_limiter.acquire_async()
+                return await self._get_once(session, url)
+                    
+            except ASYNC_REQUEST_ERRORS as e:
+                # Client errors other than 429 (e.g. unknown symbol) will not improve on retry
+                status = _response_status(e)
+                if status is not None and status != 429 and status < 500:
+                    raise
+                if attempt == self.config.RETRY_ATTEMPTS:
+                    raise
+                
+                wait = min(self.config.RETRY_BACKOFF * 2 ** (attempt - 1), self.config.RETRY_MAX_WAIT)
+                logger.warning(f"Request to {url} failed ({e}), retrying in {wait:.1f}s")
+                await asyncio.sleep(wait)
+    
+    async def _fetch_quote_batch(self, session, symbols: List[str], timestamp: Optional[str] = None) -> Dict[str, Dict]:
+        """Fetch a batch of symbols from the quote API on a shared async client"""
+        try:
+            content = await self._get_with_retry(session, f"{QUOTE_API_URL}?symbols={','.join(symbols)}")
+            return self.parse_quote_response(content, timestamp)
+            
+        except Exception as e:
+            logger.warning(f"Quote API request failed ({e}), scraping {len(symbols)} quote pages instead")
+            return {}
+    
+    def _async_client(self):
+        """Async HTTP client for a batch: multiplexed HTTP/2 through httpx when available, else aiohttp"""
+        headers = {'User-Agent': self.session.headers['User-Agent'], 'Accept-Encoding': ACCEPT_ENCODING}
+        
+        # HTTP/2 carries every request to a host over one connection instead of a pool of them;
+        # without aiohttp, httpx also serves the batch over HTTP/1.1 when USE_HTTP2 is off
+        if HTTP2_AVAILABLE and (self.config.USE_HTTP2 or aiohttp is None):
+            return httpx.AsyncClient(
+                http2=self.config.USE_HTTP2,
+                headers=headers,
+                timeout=self.config.REQUEST_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=self.config.MAX_CONCURRENCY,
+                    max_keepalive_connections=self.config.MAX_CONCURRENCY
+                )
+            )
+        
+        connector = aiohttp.TCPConnector(limit=100, ttl_dns_cache=300, keepalive_timeout=30)
+        return aiohttp.ClientSession(connector=connector, headers=headers)
+    
+    async def scrape_multiple_stocks_async(self, symbols: List[str]) -> Optional[pd.DataFrame]:
+        """Scrape data for multiple stocks concurrently"""
+        symbols = _unique_symbols(symbols)
+        logger.info(f"Scraping data for {len(symbols)} stocks concurrently: {symbols}")
+        
+        # Every record of the batch carries the same timestamp, formatted once
+        batch_timestamp = datetime.now().isoformat()
+        
+        # Bound in-flight requests so a large symbol list does not get throttled
+        semaphore = asyncio.Semaphore(self.config.MAX_CONCURRENCY)
+        
+        async def bounded_fetch(symbol: str) -> Dict:
+            async with semaphore:
+                return await self._fetch_one(session, symbol, batch_timestamp)
+        
+        # Symbols fetched moments ago are served from memory
+        cached = self._cached_records(symbols)
+        to_fetch = [symbol for symbol in symbols if symbol not in cached]
+        
+        async with self._async_client() as session:
+            # Batched JSON quotes first; only the symbols they miss are scraped page by page
+            batches = await asyncio.gather(*(
+                self._fetch_quote_batch(session, to_fetch[start:start + QUOTE_BATCH_SIZE], batch_timestamp)
+                for start in range(0, len(to_fetch), QUOTE_BATCH_SIZE)
+            ))
+            quotes = {symbol: data for batch in batches for symbol, data in batch.items()}
+            
+            remaining = [symbol for symbol in to_fetch if symbol not in quotes]
+            tasks = [bounded_fetch(symbol) for symbol in remaining]
+            results = dict(zip(remaining, await asyncio.gather(*tasks, return_exceptions=True)))
+        
+        all_stock_data = []
+        fresh = {}
+        for symbol in symbols:
+            if symbol in cached:
+                all_stock_data.append(cached[symbol])
+                continue
+            
+            stock_data = quotes[symbol] if symbol in quotes else results[symbol]
+            if isinstance(stock_data, Exception):
+                logger.error(f"Error processing {symbol}: {stock_data}")
+            elif 'error' in stock_data:
+                logger.warning(f"Failed to scrape {symbol}: {stock_data.get('error', 'Unknown error')}")
+            else:
+                all_stock_data.append(stock_data)
+                fresh[symbol] = stock_data
+        
+        self._remember_records(fresh)
+        return self._build_dataframe(all_stock_data)
+    
+    def scrape_concurrently(self, symbols: List[str]) -> Optional[pd.DataFrame]:
+        """Scrape symbols concurrently, preferring asyncio over the thread pool"""
+        # Repeated symbols are served from the record cache on either path; the HTTP
+        # cache on the requests session only backs the threaded fallback
+        if ASYNC_HTTP_AVAILABLE:
+            return asyncio.run(self.scrape_multiple_stocks_async(symbols))
+        return self.scrape_multiple_stocks(symbols)
+    
+    def scrape_multiple_stocks(self, symbols: List[str], max_workers: int = 16) -> Optional[pd.DataFrame]:
+        """Scrape data for multiple stocks using a thread pool"""
+        symbols = _unique_symbols(symbols)
         logger.info(f"Scraping data for {len(symbols)} stocks: {symbols}")
         
+        if not symbols:
+            return self._build_dataframe([])
+        
+        # Every record of the batch carries the same timestamp, formatted once
+        batch_timestamp = datetime.now().isoformat()
+        
+        # Symbols fetched moments ago are served from memory
+        cached = self._cached_records(symbols)
+        to_fetch = [symbol for symbol in symbols if symbol not in cached]
+        
+        # Batched JSON quotes first; only the symbols they miss are scraped page by page
+        quotes = self.scrape_yahoo_quote_batch(to_fetch, batch_timestamp) if to_fetch else {}
+        self._remember_records(quotes)
+        quotes.update(cached)
+        
+        remaining = [symbol for symbol in to_fetch if symbol not in quotes]
+        if not remaining:
+            return self._build_dataframe([quotes[symbol] for symbol in symbols])
+        
         all_stock_data = []
+        fresh = {}
         
-        for i, symbol in enumerate(symbols):
-            try:
-                logger.info(f"Scraping {symbol} ({i+1}/{len(symbols)})")
-                stock_data = self.scrape_stock_data(symbol)
+        # requests blocks on socket reads, so overlap them across worker threads
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(remaining))) as executor:
+            futures = {symbol: executor.submit(self.scrape_stock_data, symbol, batch_timestamp) for symbol in remaining}
+            
+            for symbol in symbols:
+                if symbol in quotes:
+                    all_stock_data.append(quotes[symbol])
+                    continue
                 
+                try:
+                    stock_data = futures[symbol].result()
+                    
+                    if 'error' not in stock_data:
+                        all_stock_data.append(stock_data)
+                        fresh[symbol] = stock_data
+                    else:
+                        logger.warning(f"Failed to scrape {symbol}: {stock_data.get('error', 'Unknown error')}")
+                        
+                except Exception as e:
+                    logger.error(f"Error processing {symbol}: {e}")
+                    continue
+        
+        self._remember_records(fresh)
+        return self._build_dataframe(all_stock_data)
+    
+    def _cached_records(self, symbols: List[str]) -> Dict[str, Dict]:
+        """Records of the given symbols fetched within the last RECORD_CACHE_TTL seconds"""
+        if not self.use_cache:
+            return {}
+        
+        now = time.monotonic()
+        hits = {}
+        for symbol in symbols:
+            entry = self._record_cache.get(symbol)
+            if entry is not None and entry[0] > now:
+                self._record_cache.move_to_end(symbol)
+                hits[symbol] = entry[1]
+        
+        return hits
+    
+    def _remember_records(self, records: Dict[str, Dict]):
+        """Keep freshly fetched records for reuse, evicting the least recently used beyond RECORD_CACHE_SIZE"""
+        if not self.use_cache:
+            return
+        
+        expires = time.monotonic() + self.config.RECORD_CACHE_TTL
+        for symbol, record in records.items():
+            self._record_cache[symbol] = (expires, record)
+            self._record_cache.move_to_end(symbol)
+        
+        while len(self._record_cache) > self.config.RECORD_CACHE_SIZE:
+            self._record_cache.popitem(last=False)
+    
+    def scrape_multiple_stocks_selenium(self, symbols: List[str], workers: int = 4) -> Optional[pd.DataFrame]:
+        """Scrape data for multiple stocks with a pool of processes, each driving its own browser"""
+        symbols = _unique_symbols(symbols)
+        logger.info(f"Scraping data for {len(symbols)} stocks with Selenium: {symbols}")
+        
+        if not symbols:
+            return self._build_dataframe([])
+        
+        all_stock_data = []
+        batch_timestamp = datetime.now().isoformat()
+        
+        # Each process has its own token bucket, so split the rate between them to keep the pool's total at REQUEST_RATE
+        workers = min(workers, len(symbols))
+        limits = (self.config.REQUEST_RATE / workers, max(1, self.config.REQUEST_BURST // workers))
+        
+        # Symbols go to whichever worker is free; leaving the block lets each worker quit its Chrome
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_selenium_worker, initargs=limits) as executor:
+            for symbol, stock_data in zip(symbols, executor.map(_scrape_with_selenium, symbols, repeat(batch_timestamp))):
                 if 'error' not in stock_data:
                     all_stock_data.append(stock_data)
                 else:
                     logger.warning(f"Failed to scrape {symbol}: {stock_data.get('error', 'Unknown error')}")
-                
-                # Add delay between stocks
-                if i < len(symbols) - 1:
-                    time.sleep(random.uniform(2, 5))
-                    
-            except Exception as e:
-                logger.error(f"Error processing {symbol}: {e}")
-                continue
         
+        return self._build_dataframe(all_stock_data)
+    
+    def _build_dataframe(self, all_stock_data: List[Dict]) -> Optional[pd.DataFrame]:
+        """Assemble scraped records into a single DataFrame"""
         if all_stock_data:
-            df = pd.DataFrame(all_stock_data)
+            # Build each column once with its final dtype instead of inferring it from row dicts;
+            # columns no record has are left out, as before
+            present = set().union(*all_stock_data)
+            columns = {}
+            for col in RECORD_COLUMNS:
+                if col in present:
+                    values = [record.get(col) for record in all_stock_data]
+                    columns[col] = self.clean_price_column(values) if col in FLOAT_COLUMNS else values
+            
+            df = pd.DataFrame(columns)
             logger.info(f"Successfully scraped {len(df)} stocks")
             return df
         else:
             logger.error("No stock data scraped successfully")
             return None
     
-    def scrape_stock_data(self, symbol: str) -> Dict:
+    def scrape_stock_data(self, symbol: str, timestamp: Optional[str] = None) -> Dict:
         """Scrape stock data from multiple sources"""
         logger.info(f"Scraping data for {symbol}")
         
         # Try Yahoo Finance first
         try:
-            data = self.scrape_yahoo_finance(symbol)
+            data = self.scrape_yahoo_finance(symbol, timestamp)
             if 'error' not in data:
                 return data
         except Exception as e:
             logger.error(f"Error scraping {symbol} from Yahoo Finance: {e}")
             
-        # Fallback to basic data structure
-        return {
-            'symbol': symbol,
-            'current_price': None,
-            'change': None,
-            'change_percent': None,
-            'timestamp': datetime.now().isoformat(),
-            'error': 'Could not fetch data'
-        }
-    
-    def clean_price(self, price_str: str) -> Optional[float]:
-        """Clean and convert price string to float"""
-        if not price_str:
-            return None
-            
-        try:
-            # Remove currency symbols and commas
-            cleaned = re.sub(r'[^0-9.-]', '', price_str)
-            return float(cleaned) if cleaned else None
-        except:
-            return None
+        # Fallback to basic data structure; callers drop error records, so a second-resolution timestamp will do
+        record = FAILED_RECORD_TEMPLATE.copy()
+        record['symbol'] = symbol
+        record['timestamp'] = timestamp or datetime.now().isoformat(timespec='seconds')
+        return record
     
-    def clean_percentage(self, percent_str: str) -> Optional[float]:
-        """Clean and convert percentage string to float"""
-        if not percent_str:
-            return None
-            
-        try:
-            # Remove % sign and parentheses
-            cleaned = re.sub(r'[^0-9.-]', '', percent_str)
-            return float(cleaned) if cleaned else None
-        except:
-            return None
+    def clean_price_column(self, values: List) -> np.ndarray:
+        """Convert a column of scraped price or percentage text, numbers and None to float64 in one pass"""
+        series = pd.Series(values, dtype=object)
+        
+        # Text is stripped to digits, '.' and '-'; numbers pass through as they are
+        if pd.api.types.infer_dtype(series, skipna=True) not in ('floating', 'integer', 'mixed-integer-float', 'empty'):
+            stripped = series.str.replace(NUMBER_STRIP_PATTERN, '', regex=True)
+            series = stripped.where(stripped.notna(), series)
+        
+        return pd.to_numeric(series, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
     
     def extract_yahoo_summary_data(self, soup: BeautifulSoup) -> Dict:
         """Extract additional data from Yahoo Finance summary table"""
         data = {}
         
         try:
-            # Find all data rows
-            rows = soup.find_all('tr')
-            
-            for row in rows:
-                cells = row.find_all('td')
-                if len(cells) >= 2:
-                    key = cells[0].get_text().strip()
-                    value = cells[1].get_text().strip()
-                    
-                    # Map keys to our data structure
-                    if 'Previous Close' in key:
-                        data['previous_close'] = self.clean_price(value)
-                    elif 'Open' in key:
-                        data['open'] = self.clean_price(value)
-                    elif 'Volume' in key:
-                        data['volume'] = value
-                    elif 'Market Cap' in key:
-                        data['market_cap'] = value
-                    elif 'P/E Ratio' in key:
-                        data['pe_ratio'] = self.clean_price(value)
+            # PAGE_STRAINER keeps the page's tables but not their containers, so every row is a
+            # candidate; exact label matches keep rows from other tables from filling a field
+            for row in soup.find_all('tr'):
+                cells = row.find_all('td', limit=2)
+                if len(cells) < 2:
+                    continue
+                
+                # One dict lookup per row; "Market Cap (intraday)" and "PE Ratio (TTM)" match their base label
+                label = cells[0].get_text().strip().split(' (')[0]
+                field = SUMMARY_FIELDS.get(label)
+                if field is None:
+                    continue
+                
+                data[field] = cells[1].get_text().strip()
                         
         except Exception as e:
             logger.warning(f"Error extracting Yahoo summary data: {e}")
             
         return data
     
-    def __del__(self):
-        """Clean up resources"""
-        if self.driver:
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def close(self):
+        """Close the HTTP session and quit the browser, if one was started"""
+        self.session.close()
+        
+        # Only quit a driver that was actually started; reading self.driver here would start one
+        driver = self.__dict__.pop('driver', None)
+        if driver:
             try:
-                self.driver.quit()
+                driver.quit()
             except:
                 pass
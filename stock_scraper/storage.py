@@ -0,0 +1,253 @@
+"""
+Stock Data Web Scraper - Storage Module
+Handles reading and writing of collected and processed data files
+"""
+
+import os
+import logging
+import pandas as pd
+from typing import Dict, List, Tuple
+
+try:
+    import pyarrow
+    import pyarrow.csv
+    import pyarrow.dataset
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # Parquet/Arrow output needs pyarrow; fall back to CSV without it
+    pyarrow = None
+
+logger = logging.getLogger(__name__)
+
+ARROW_AVAILABLE = pyarrow is not None
+
+# File types the application knows how to read back
+DATA_FILE_EXTENSIONS = ('.csv', '.parquet', '.arrow')
+
+# A fixed float format lets pandas skip its per-cell repr(float) path when writing CSV
+CSV_FLOAT_DECIMALS = 4
+CSV_WRITE_OPTIONS = {
+    'index': False,
+    'float_format': f'%.{CSV_FLOAT_DECIMALS}f',
+    'chunksize': 100_000,
+    'lineterminator': '\n'
+}
+
+# Scheduled runs append to one dataset, one directory per collection date
+DATASET_PARTITION_COLUMN = 'date'
+
+# Below this many rows the Arrow conversion costs more than pandas' writer saves
+ARROW_CSV_MIN_ROWS = 10_000
+ARROW_CSV_BATCH_SIZE = 65536
+
+# Read size when counting CSV lines for previews
+CSV_COUNT_CHUNK_SIZE = 1 << 20
+
+
+def save_dataframe(df: pd.DataFrame, filename_stem: str, fmt: str = 'parquet') -> str:
+    """Save a DataFrame as Parquet, Arrow IPC or CSV and return the written filename"""
+    if fmt in ('parquet', 'arrow') and not ARROW_AVAILABLE:
+        logger.warning(f"pyarrow is not installed, saving as CSV instead of {fmt}")
+        fmt = 'csv'
+
+    if fmt == 'parquet':
+        filename = f"{filename_stem}.parquet"
+        df.to_parquet(filename, engine='pyarrow', compression='zstd', index=False)
+    elif fmt == 'arrow':
+        filename = f"{filename_stem}.arrow"
+        write_arrow(df, filename)
+    else:
+        filename = f"{filename_stem}.csv"
+        write_csv(df, filename)
+
+    logger.info(f"Saved {len(df)} records to {filename}")
+
+    return filename
+
+
+def _arrow_csv_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Round floats and format datetimes as the pandas writer does, so both writers give the same values"""
+    converted = {}
+    for col in df.columns:
+        values = df[col]
+        if pd.api.types.is_float_dtype(values.dtype):
+            converted[col] = values.round(CSV_FLOAT_DECIMALS)
+        elif pd.api.types.is_datetime64_any_dtype(values.dtype):
+            # astype(str) uses to_csv's formatting, e.g. no fraction when every value is on the second
+            converted[col] = values.astype(str).where(values.notna())
+    
+    return df.assign(**converted) if converted else df
+
+
+def write_csv(df: pd.DataFrame, filename: str):
+    """Write a DataFrame as CSV, using Arrow's C++ writer for large frames"""
+    if ARROW_AVAILABLE and len(df) > ARROW_CSV_MIN_ROWS:
+        try:
+            # Arrow still quotes every string and drops trailing zeros (1.5, not 1.5000);
+            # the values read back are the same as from the pandas writer
+            table = pyarrow.Table.from_pandas(_arrow_csv_frame(df), preserve_index=False)
+            pyarrow.csv.write_csv(
+                table,
+                filename,
+                write_options=pyarrow.csv.WriteOptions(batch_size=ARROW_CSV_BATCH_SIZE)
+            )
+            return
+        except (pyarrow.ArrowInvalid, pyarrow.ArrowNotImplementedError) as e:
+            logger.warning(f"Arrow CSV writer failed ({e}), using pandas writer")
+
+    df.to_csv(filename, **CSV_WRITE_OPTIONS)
+
+
+def write_arrow(df: pd.DataFrame, filename: str):
+    """Write a DataFrame as an uncompressed Arrow IPC file"""
+    table = pyarrow.Table.from_pandas(df, preserve_index=False)
+    with pyarrow.OSFile(filename, 'wb') as sink:
+        with pyarrow.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def arrow_string_dtype(arrow_type):
+    """types_mapper keeping text columns as Arrow strings and everything else on NumPy"""
+    if pyarrow.types.is_string(arrow_type) or pyarrow.types.is_large_string(arrow_type):
+        return pd.ArrowDtype(arrow_type)
+
+    return None
+
+
+def read_arrow(filename: str, types_mapper=None) -> pd.DataFrame:
+    """Read an Arrow IPC file through a memory map instead of parsing it"""
+    with pyarrow.memory_map(filename, 'r') as source:
+        table = pyarrow.ipc.open_file(source).read_all()
+
+    # Strings and nullable columns always need a copy, so zero_copy_only is not usable
+    return table.to_pandas(split_blocks=True, types_mapper=types_mapper)
+
+
+def read_csv(filename: str, types_mapper=None) -> pd.DataFrame:
+    """Read a CSV file with Arrow's multi-threaded parser"""
+    if not ARROW_AVAILABLE:
+        return pd.read_csv(filename)
+    
+    # Empty fields in text columns are missing values, as pandas treats them
+    table = pyarrow.csv.read_csv(
+        filename,
+        read_options=pyarrow.csv.ReadOptions(use_threads=True),
+        convert_options=pyarrow.csv.ConvertOptions(strings_can_be_null=True)
+    )
+    
+    # Numeric columns stay on NumPy: the analysis relies on reductions (skew, kurt) Arrow arrays lack
+    return table.to_pandas(split_blocks=True, types_mapper=types_mapper)
+
+
+def _is_arrow_backed(dtype) -> bool:
+    """Whether a column's values live in a pyarrow array"""
+    return isinstance(dtype, pd.ArrowDtype) or (isinstance(dtype, pd.StringDtype) and dtype.storage == 'pyarrow')
+
+
+def null_counts(df: pd.DataFrame) -> Dict[str, int]:
+    """Missing values per column, read from Arrow's stored null counts where available"""
+    counts = {}
+    for col in df.columns:
+        values = df[col]
+        if ARROW_AVAILABLE and _is_arrow_backed(values.dtype):
+            # Arrow keeps a null count with every array, so nothing has to be scanned
+            counts[col] = values.array.__arrow_array__().null_count
+        else:
+            # count() is a single validity pass, without building an isnull() frame
+            counts[col] = len(values) - int(values.count())
+    
+    return counts
+
+
+def load_dataframe(filename: str, arrow_strings: bool = False) -> pd.DataFrame:
+    """Load a DataFrame, picking the reader from the file extension"""
+    # Arrow strings keep text in contiguous buffers instead of one Python object per cell
+    types_mapper = arrow_string_dtype if arrow_strings and ARROW_AVAILABLE else None
+
+    if filename.endswith('.parquet'):
+        if types_mapper is not None:
+            return pyarrow.parquet.read_table(filename).to_pandas(types_mapper=types_mapper)
+        return pd.read_parquet(filename, engine='pyarrow')
+
+    if filename.endswith('.arrow'):
+        return read_arrow(filename, types_mapper)
+
+    return read_csv(filename, types_mapper)
+
+
+def count_csv_rows(filename: str) -> int:
+    """Count the data rows of a CSV file by scanning for line breaks, without parsing it"""
+    lines = 0
+    last = b'\n'
+    with open(filename, 'rb') as f:
+        for chunk in iter(lambda: f.read(CSV_COUNT_CHUNK_SIZE), b''):
+            lines += chunk.count(b'\n')
+            last = chunk[-1:]
+    
+    # A last line without a trailing newline still counts; the header does not
+    if last != b'\n':
+        lines += 1
+    return max(lines - 1, 0)
+
+
+def preview_dataframe(filename: str, rows: int = 10) -> Tuple[pd.DataFrame, int]:
+    """Read only the first rows of a data file, plus the file's total row count"""
+    if filename.endswith('.parquet') and ARROW_AVAILABLE:
+        # The row count is in the Parquet footer; only the first batch is decoded
+        parquet_file = pyarrow.parquet.ParquetFile(filename)
+        batch = next(parquet_file.iter_batches(batch_size=rows), None)
+        table = pyarrow.Table.from_batches([batch]) if batch is not None else parquet_file.schema_arrow.empty_table()
+        return table.to_pandas(types_mapper=arrow_string_dtype), parquet_file.metadata.num_rows
+    
+    if filename.endswith('.arrow'):
+        # Memory-mapped batches: counting rows only touches batch headers
+        with pyarrow.memory_map(filename, 'r') as source:
+            reader = pyarrow.ipc.open_file(source)
+            batches = [reader.get_batch(i) for i in range(reader.num_record_batches)]
+            table = pyarrow.Table.from_batches(batches, schema=reader.schema)
+            return table.slice(0, rows).to_pandas(types_mapper=arrow_string_dtype), table.num_rows
+    
+    if filename.endswith('.parquet'):
+        df = load_dataframe(filename)
+        return df.head(rows), len(df)
+    
+    return pd.read_csv(filename, nrows=rows), count_csv_rows(filename)
+
+
+def append_to_dataset(df: pd.DataFrame, base_dir: str, partition_value: str, basename: str) -> List[str]:
+    """Append a DataFrame to a date-partitioned Parquet dataset and return the written files"""
+    if not ARROW_AVAILABLE:
+        logger.warning("pyarrow is not installed, saving as CSV instead of a Parquet dataset")
+        partition_dir = os.path.join(base_dir, f"{DATASET_PARTITION_COLUMN}={partition_value}")
+        os.makedirs(partition_dir, exist_ok=True)
+        return [save_dataframe(df, os.path.join(partition_dir, basename), 'csv')]
+    
+    table = pyarrow.Table.from_pandas(df, preserve_index=False)
+    table = table.append_column(
+        DATASET_PARTITION_COLUMN,
+        pyarrow.array([partition_value] * table.num_rows, pyarrow.string())
+    )
+    
+    # Each run adds new files under its partition, so nothing already written is rewritten
+    written = []
+    pyarrow.dataset.write_dataset(
+        table,
+        base_dir,
+        format='parquet',
+        partitioning=[DATASET_PARTITION_COLUMN],
+        partitioning_flavor='hive',
+        basename_template=f"{basename}-{{i}}.parquet",
+        existing_data_behavior='overwrite_or_ignore',
+        file_visitor=lambda written_file: written.append(written_file.path)
+    )
+    logger.info(f"Appended {len(df)} records to dataset {base_dir}")
+    
+    return written
+
+
+def list_dataset_files(base_dir: str) -> List[str]:
+    """List the data files of a partitioned dataset, or nothing if it does not exist yet"""
+    if not ARROW_AVAILABLE or not os.path.isdir(base_dir):
+        return []
+    
+    return pyarrow.dataset.dataset(base_dir, format='parquet', partitioning='hive').files